@@ -38,6 +38,7 @@ from .core.jsondict import in_buffered_mode as is_buffered
 from .core.jsondict import flush_all as flush
 from .core.jsondict import get_buffer_size
 from .core.jsondict import get_buffer_load
+from .core.jsondict import buffer_stats
 
 
 __version__ = '0.9.3'
@@ -54,4 +55,5 @@ __all__ = ['__version__', 'contrib', 'db', 'errors', 'sync',
            'MasterCrawler',
            'SignacProjectCrawler',
            'buffered', 'is_buffered', 'flush', 'get_buffer_size', 'get_buffer_load',
+           'buffer_stats',
            ]
@@ -266,6 +266,7 @@ def main_document(args):
 
 def main_remove(args):
     project = get_project()
+    jobs = []
     for job_id in args.job_id:
         job = _open_job_by_id(project, job_id)
         if args.interactive and not query_yes_no(
@@ -273,12 +274,25 @@ def main_remove(args):
                 action='clear' if args.clear else 'remove',
                 job=job), default='no'):
                 continue
+        if args.parallel:
+            jobs.append(job)    # The confirmed jobs are removed together below.
+            continue
         if args.clear:
             job.clear()
         else:
             job.remove()
         if args.verbose:
             print(job_id)
+    if args.parallel:
+        if args.clear:
+            freed = project.clear_jobs(jobs, workers=args.parallel)
+        else:
+            freed = project.remove_jobs(jobs, workers=args.parallel)
+        if args.verbose:
+            for job in jobs:
+                print(job)
+            _print_err("{} {} job(s), freed {}.".format(
+                'Cleared' if args.clear else 'Removed', len(jobs), _fmt_bytes(freed)))
 
 
 def main_move(args):
@@ -521,6 +535,19 @@ def main_update_cache(args):
         _print_err("Updated cache (size={}).".format(n))
 
 
+def main_shard(args):
+    project = get_project()
+    if args.sharding == project._sharding:
+        _print_err("The workspace already has sharding {}.".format(args.sharding))
+        return
+    if not args.yes and not query_yes_no(
+            "Move all jobs to a workspace layout with sharding {}?".format(args.sharding),
+            default='no'):
+        return
+    n = project.shard_workspace(args.sharding)
+    _print_err("Moved {} jobs.".format(n))
+
+
 def verify_config(cfg, preserve_errors=True):
     verification = cfg.verify(
         preserve_errors=preserve_errors, skip_missing=True)
@@ -996,6 +1023,11 @@ def main():
         '-v', '--verbose',
         action='store_true',
         help="Be verbose when removing/clearing files.")
+    parser_remove.add_argument(
+        '-p', '--parallel',
+        type=int,
+        help="The number of jobs to remove/clear in parallel. Without this option, "
+             "each job is removed/cleared right after its confirmation.")
     parser_remove.set_defaults(func=main_remove)
 
     parser_move = subparsers.add_parser('move')
@@ -1318,6 +1350,22 @@ job documents."
 This feature is still experimental and may be removed in future versions.""")
     parser_update_cache.set_defaults(func=main_update_cache)
 
+    parser_shard = subparsers.add_parser(
+        'shard',
+        description="""Convert the project's workspace in place to a sharded layout, where
+each job directory is nested within SHARDING levels of shard directories, e.g.,
+'workspace/ab/cd/<id>' for a sharding of 2. A sharding of 0 restores the flat layout.""")
+    parser_shard.add_argument(
+        'sharding',
+        type=int,
+        choices=range(5),
+        help="The number of shard directory levels.")
+    parser_shard.add_argument(
+        '-y', '--yes',
+        action='store_true',
+        help="Do not ask for confirmation.")
+    parser_shard.set_defaults(func=main_shard)
+
     parser_config = subparsers.add_parser('config')
     parser_config.add_argument(
         '-g', '--global',
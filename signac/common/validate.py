@@ -53,6 +53,8 @@ cfg = """
 workspace_dir = string(default='workspace')
 project = string()
 signac_version = version(default='0,1,0')
+workspace_sharding = integer(min=0, max=4)
+document_codec = option('json', 'msgpack', 'cbor', default='json')
 
 [General]
 default_host = string()
@@ -0,0 +1,234 @@
+# Copyright (c) 2018 The Regents of the University of Michigan
+# All rights reserved.
+# This software is licensed under the BSD 3-Clause License.
+"Persistent state point and job document cache with a SQLite backend."
+import os
+import errno
+import gzip
+import sqlite3
+import logging
+import threading
+
+from ..core.json import json
+
+logger = logging.getLogger(__name__)
+
+# Maximum number of host parameters per statement supported by all SQLite versions.
+_MAX_VARIABLES = 500
+
+# Character following all lower-case hexadecimal digits; used to express prefix queries
+# as index range scans.
+_PREFIX_UPPER_BOUND = '~'
+
+
+def _chunks(iterable, n):
+    chunk = []
+    for item in iterable:
+        chunk.append(item)
+        if len(chunk) == n:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+class StatepointCache(object):
+    """A persistent mapping of job ids to state points.
+
+    The cache is stored in a single SQLite database file, which allows
+    to insert, update, and delete individual entries and to look up
+    state points by job id or id prefix without reading the whole cache.
+
+    In addition, the cache may store the parsed job documents together with a
+    signature of the corresponding document file, which allows to determine
+    which documents need to be re-read.
+
+    All operations are serialized with a lock, so that one cache instance
+    may be shared by multiple threads.
+
+    :param filename: The path to the cache database file.
+    :type filename: str
+    """
+
+    def __init__(self, filename):
+        self._filename = filename
+        self._lock = threading.Lock()
+        self._connection = None
+
+    def __getstate__(self):
+        return {'_filename': self._filename}
+
+    def __setstate__(self, state):
+        self.__init__(state['_filename'])
+
+    def _connect(self):
+        if self._connection is None:
+            connection = sqlite3.connect(self._filename, check_same_thread=False)
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS statepoints "
+                "(id TEXT PRIMARY KEY, statepoint TEXT NOT NULL)")
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS documents "
+                "(id TEXT PRIMARY KEY, signature TEXT, document TEXT NOT NULL)")
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+            connection.commit()
+            self._connection = connection
+        return self._connection
+
+    def close(self):
+        "Close the connection to the cache database."
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+
+    def __len__(self):
+        with self._lock:
+            return self._connect().execute("SELECT COUNT(*) FROM statepoints").fetchone()[0]
+
+    def __contains__(self, _id):
+        with self._lock:
+            cursor = self._connect().execute(
+                "SELECT 1 FROM statepoints WHERE id = ?", (_id, ))
+            return cursor.fetchone() is not None
+
+    def __getitem__(self, _id):
+        with self._lock:
+            row = self._connect().execute(
+                "SELECT statepoint FROM statepoints WHERE id = ?", (_id, )).fetchone()
+        if row is None:
+            raise KeyError(_id)
+        return json.loads(row[0])
+
+    def get(self, _id, default=None):
+        try:
+            return self[_id]
+        except KeyError:
+            return default
+
+    def get_many(self, ids):
+        "Return a dict of all state points found in the cache for the given ids."
+        ret = dict()
+        with self._lock:
+            connection = self._connect()
+            for chunk in _chunks(ids, _MAX_VARIABLES):
+                cursor = connection.execute(
+                    "SELECT id, statepoint FROM statepoints WHERE id IN ({})".format(
+                        ','.join('?' * len(chunk))), chunk)
+                for _id, sp in cursor:
+                    ret[str(_id)] = json.loads(sp)
+        return ret
+
+    def ids(self):
+        "Return a list of all job ids in the cache."
+        with self._lock:
+            cursor = self._connect().execute("SELECT id FROM statepoints")
+            return [str(row[0]) for row in cursor]
+
+    def find_ids(self, prefix):
+        "Return a list of all job ids in the cache starting with prefix."
+        with self._lock:
+            cursor = self._connect().execute(
+                "SELECT id FROM statepoints WHERE id >= ? AND id < ?",
+                (prefix, prefix + _PREFIX_UPPER_BOUND))
+            return [str(row[0]) for row in cursor]
+
+    def items(self):
+        "Return a dict of all cached ids and state points."
+        with self._lock:
+            cursor = self._connect().execute("SELECT id, statepoint FROM statepoints")
+            return {str(_id): json.loads(sp) for _id, sp in cursor}
+
+    def update(self, statepoints):
+        "Insert or replace the given mapping of ids to state points."
+        rows = [(_id, json.dumps(sp)) for _id, sp in statepoints.items()]
+        with self._lock:
+            connection = self._connect()
+            with connection:
+                connection.executemany(
+                    "INSERT OR REPLACE INTO statepoints (id, statepoint) VALUES (?, ?)", rows)
+
+    def __setitem__(self, _id, statepoint):
+        self.update({_id: statepoint})
+
+    def delete(self, ids):
+        "Delete all entries, including cached documents, for the given ids."
+        ids = list(ids)
+        with self._lock:
+            connection = self._connect()
+            with connection:
+                connection.executemany(
+                    "DELETE FROM statepoints WHERE id = ?", ((_id, ) for _id in ids))
+                connection.executemany(
+                    "DELETE FROM documents WHERE id = ?", ((_id, ) for _id in ids))
+
+    def __delitem__(self, _id):
+        self.delete([_id])
+
+    def get_documents(self, ids):
+        "Return a dict of all (signature, document) pairs found in the cache for the given ids."
+        ret = dict()
+        with self._lock:
+            connection = self._connect()
+            for chunk in _chunks(ids, _MAX_VARIABLES):
+                cursor = connection.execute(
+                    "SELECT id, signature, document FROM documents WHERE id IN ({})".format(
+                        ','.join('?' * len(chunk))), chunk)
+                for _id, signature, doc in cursor:
+                    ret[str(_id)] = json.loads(signature), json.loads(doc)
+        return ret
+
+    def update_documents(self, documents):
+        "Insert or replace the given mapping of ids to (signature, document) pairs."
+        rows = [(_id, json.dumps(signature), json.dumps(doc))
+                for _id, (signature, doc) in documents.items()]
+        with self._lock:
+            connection = self._connect()
+            with connection:
+                connection.executemany(
+                    "INSERT OR REPLACE INTO documents (id, signature, document) "
+                    "VALUES (?, ?, ?)", rows)
+
+    def get_meta(self, key, default=None):
+        "Return the value of a meta data entry."
+        with self._lock:
+            row = self._connect().execute(
+                "SELECT value FROM meta WHERE key = ?", (key, )).fetchone()
+        return default if row is None else json.loads(row[0])
+
+    def set_meta(self, key, value):
+        "Store a meta data entry."
+        with self._lock:
+            connection = self._connect()
+            with connection:
+                connection.execute(
+                    "INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)",
+                    (key, json.dumps(value)))
+
+    def import_legacy(self, filename):
+        """Import the entries of a gzip-compressed JSON state point cache file.
+
+        :returns: The number of imported entries or None if the file does not exist.
+        """
+        try:
+            with gzip.open(filename, 'rb') as cachefile:
+                cache = json.loads(cachefile.read().decode())
+        except IOError as error:
+            if error.errno != errno.ENOENT:
+                raise
+        else:
+            logger.info("Importing legacy state point cache file '{}'.".format(filename))
+            self.update(cache)
+            return len(cache)
+
+    @classmethod
+    def open(cls, filename, create=False):
+        """Open the cache stored in filename.
+
+        :param create: Create the cache file if it does not exist yet.
+        :returns: The cache or None if the cache file does not exist and
+            create is False.
+        """
+        if create or os.path.isfile(filename):
+            return cls(filename)
@@ -15,11 +15,14 @@
 import sys
 import io
 import re
+import time
 import logging
+import threading
 import warnings
 import argparse
 import operator
-from collections import defaultdict
+from bisect import bisect_left, bisect_right, insort
+from collections import defaultdict, OrderedDict
 from itertools import islice
 
 from ..core.json import json
@@ -46,6 +49,18 @@ _INDEX_OPERATORS = ('$eq', '$gt', '$gte', '$lt', '$lte', '$ne',
                     '$in', '$nin', '$regex', '$type', '$where',
                     '$near')
 
+_RANGE_OPERATORS = ('$gt', '$gte', '$lt', '$lte')
+
+# The query planner combines all range operators for the same key into a
+# single step with this pseudo-operator.
+_RANGE = '$range'
+
+# The estimated fraction of documents that match an expression, in case that
+# the estimate can't be based on the statistics of an existing index.
+_EQUALITY_SELECTIVITY = 0.1
+_RANGE_SELECTIVITY = 1.0 / 3
+_DEFAULT_SELECTIVITY = 0.5
+
 _TYPES = {
     'int': int,
     'float': float,
@@ -58,6 +73,13 @@ _TYPES = {
 
 MAX_DEFAULT_ID = int('F' * 32, 16)
 
+# The maximum number of compiled $regex and $where arguments that are cached.
+PREDICATE_CACHE_SIZE = 256
+
+# Callables in filters are replaced by strings with this prefix during
+# the normalization of the filter.
+_CALLABLE_PREFIX = '__signac_callable_'
+
 
 def _flatten(container):
     for i in container:
@@ -156,6 +178,229 @@ def _build_index(docs, key, primary_key):
     return index
 
 
+_NUMBER_TYPES = six.integer_types + (float, )
+
+
+def _sort_kind(value):
+    "Return the kind of value for sorted indexes ('number' or 'str') or None."
+    if isinstance(value, six.string_types):
+        return 'str'
+    elif isinstance(value, _NUMBER_TYPES) and value == value:   # excludes NaN
+        return 'number'
+
+
+class _SortedValues(object):
+    """Sorted arrays of the numeric and string values of an index.
+
+    The sorted values allow to find all values within a range in
+    O(log(n) + k) time, where k is the number of values within the range.
+    Values of all other types are not sorted.
+    """
+
+    def __init__(self, values):
+        self._values = {'number': [], 'str': []}
+        for value in values:
+            kind = _sort_kind(value)
+            if kind is not None:
+                self._values[kind].append(value)
+        for values in self._values.values():
+            values.sort()
+
+    def add(self, value):
+        kind = _sort_kind(value)
+        if kind is not None:
+            insort(self._values[kind], value)
+
+    def remove(self, value):
+        kind = _sort_kind(value)
+        if kind is not None:
+            values = self._values[kind]
+            i = bisect_left(values, value)
+            if i < len(values) and values[i] == value:
+                del values[i]
+
+    def range(self, kind, lower=None, upper=None, lower_inclusive=True, upper_inclusive=True):
+        "Return all values of the given kind within the range."
+        values = self._values[kind]
+        if lower is None:
+            start = 0
+        else:
+            start = (bisect_left if lower_inclusive else bisect_right)(values, lower)
+        if upper is None:
+            stop = len(values)
+        else:
+            stop = (bisect_right if upper_inclusive else bisect_left)(values, upper)
+        return values[start:stop]
+
+
+class _LRUCache(object):
+    "Cache of at most maxsize values, the least recently used values are discarded."
+
+    def __init__(self, maxsize):
+        self._maxsize = maxsize
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, factory):
+        "Return the value for key, which is created with factory(key) if needed."
+        with self._lock:
+            try:
+                value = self._data.pop(key)
+            except KeyError:
+                pass
+            else:
+                self._data[key] = value
+                return value
+        value = factory(key)
+        with self._lock:
+            self._data[key] = value
+            while len(self._data) > self._maxsize:
+                self._data.popitem(last=False)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+_REGEX_CACHE = _LRUCache(PREDICATE_CACHE_SIZE)
+_WHERE_CACHE = _LRUCache(PREDICATE_CACHE_SIZE)
+
+
+def _compile_regex(argument):
+    return _REGEX_CACHE.get(argument, re.compile)
+
+
+def _compile_where(argument):
+    "Return the callable for a $where argument, which is a callable or a string expression."
+    if callable(argument):
+        return argument
+    return _WHERE_CACHE.get(argument, eval)
+
+
+def _normalize_filter(filter):
+    "Normalize the filter with a JSON round trip, retaining callables (for $where)."
+    callables = dict()
+
+    def default(o):
+        if callable(o):
+            token = '{}{}'.format(_CALLABLE_PREFIX, len(callables))
+            callables[token] = o
+            return token
+        raise TypeError("Object of type '{}' is not JSON serializable.".format(type(o)))
+
+    filter = json.loads(json.dumps(filter, default=default))
+    if not callables:
+        return filter
+
+    def restore(f):
+        if isinstance(f, dict):
+            return {k: restore(v) for k, v in f.items()}
+        elif isinstance(f, list):
+            return [restore(v) for v in f]
+        elif isinstance(f, six.string_types) and f in callables:
+            return callables[f]
+        else:
+            return f
+    return restore(filter)
+
+
+def _near_arguments(argument):
+    rel_tol, abs_tol = 1e-9, 0.0  # default values
+    if isinstance(argument, (list, tuple)):
+        if len(argument) == 1:
+            argument = argument[0]
+        elif len(argument) == 2:
+            argument, rel_tol = argument
+        elif len(argument) == 3:
+            argument, rel_tol, abs_tol = argument
+        else:
+            err_msg = 'The argument of the $near operator must be a float '
+            err_msg += 'or a list of floats with length 1, 2, or 3.'
+            raise ValueError(err_msg)
+    return float(argument), float(rel_tol), float(abs_tol)
+
+
+def _range_values(sorted_values, conditions):
+    """Find all values that satisfy all of the range conditions.
+
+    Only values of the same kind (numbers or strings) as the arguments
+    are considered to match.
+
+    :param conditions: A list of ($gt|$gte|$lt|$lte, argument) tuples.
+    :returns: The list of matching values or None if the arguments can't
+        be used with the sorted values.
+    """
+    if any(isinstance(argument, float) and argument != argument for _, argument in conditions):
+        return []    # Comparisons with NaN are always false.
+    kinds = {_sort_kind(argument) for _, argument in conditions}
+    if None in kinds:
+        return None
+    if len(kinds) > 1:
+        return []
+    lower = upper = None
+    lower_inclusive = upper_inclusive = True
+    for op, argument in conditions:
+        if op in ('$gt', '$gte'):
+            inclusive = op == '$gte'
+            if lower is None or argument > lower or (argument == lower and not inclusive):
+                lower, lower_inclusive = argument, inclusive
+        else:
+            inclusive = op == '$lte'
+            if upper is None or argument < upper or (argument == upper and not inclusive):
+                upper, upper_inclusive = argument, inclusive
+    return sorted_values.range(kinds.pop(), lower, upper, lower_inclusive, upper_inclusive)
+
+
+def _find_range(index, sorted_values, conditions):
+    """Find all ids with values that satisfy all of the range conditions.
+
+    :returns: The set of matching ids or None if the arguments can't be
+        used with the sorted values.
+    """
+    values = _range_values(sorted_values, conditions)
+    if values is None:
+        return None
+    matches = set()
+    for value in values:
+        matches.update(index[value])
+    return matches
+
+
+def _find_near(index, sorted_values, argument):
+    "Find all ids with numeric values that are close to the $near argument."
+    argument, rel_tol, abs_tol = _near_arguments(argument)
+    # All values close to the argument are within argument +/- delta:
+    if rel_tol < 1 and abs(argument) != float('inf'):
+        delta = max(abs_tol, rel_tol * abs(argument) / (1 - rel_tol))
+        candidates = sorted_values.range('number', argument - delta, argument + delta)
+    else:
+        candidates = sorted_values.range('number')
+    matches = set()
+    for value in candidates:
+        if isclose(value, argument, rel_tol=rel_tol, abs_tol=abs_tol):
+            matches.update(index[value])
+    return matches
+
+
+def _find_in(index, argument):
+    """Find all ids with values that are in the $in argument.
+
+    Each element of the argument is looked up directly in the index, which
+    means that this function returns None (unsupported) if the argument is
+    not a sequence of values.
+    """
+    if not isinstance(argument, (list, tuple)):
+        return None
+    matches = set()
+    for value in argument:
+        try:
+            matches.update(index.get(_to_tuples(value), ()))
+        except TypeError:   # unhashable values are never indexed
+            pass
+    return matches
+
+
 def _find_with_index_operator(index, op, argument):
     if op == '$in':
         def op(value, argument):
@@ -164,9 +409,11 @@ def _find_with_index_operator(index, op, argument):
         def op(value, argument):
             return value not in argument
     elif op == '$regex':
+        regex = _compile_regex(argument)
+
         def op(value, argument):
             if isinstance(value, basestring if six.PY2 else str):  # noqa
-                return re.search(argument, value)
+                return regex.search(value)
             else:
                 return False
     elif op == '$type':
@@ -177,24 +424,12 @@ def _find_with_index_operator(index, op, argument):
                 raise ValueError("Unknown argument for $type operator: '{}'.".format(argument))
             return isinstance(value, t)
     elif op == '$where':
+        func = _compile_where(argument)
+
         def op(value, argument):
-            return eval(argument)(value)
+            return func(value)
     elif op == '$near':
-        rel_tol, abs_tol = 1e-9, 0.0  # default values
-        if isinstance(argument, (list, tuple)):
-            if len(argument) == 1:
-                argument = argument[0]
-            elif len(argument) == 2:
-                argument, rel_tol = argument
-            elif len(argument) == 3:
-                argument, rel_tol, abs_tol = argument
-            else:
-                err_msg = 'The argument of the $near operator must be a float '
-                err_msg += 'or a list of floats with length 1, 2, or 3.'
-                raise ValueError(err_msg)
-        argument = float(argument)
-        rel_tol = float(rel_tol)
-        abs_tol = float(abs_tol)
+        argument, rel_tol, abs_tol = _near_arguments(argument)
 
         def op(value, argument):
             return isclose(value, argument, rel_tol=rel_tol, abs_tol=abs_tol)
@@ -207,6 +442,21 @@ def _find_with_index_operator(index, op, argument):
     return matches
 
 
+def _split_operator(key):
+    "Split a filter key into the document key and the expression-operator (or None)."
+    if '$' not in key:
+        return key, None
+    if key.count('$') > 1:
+        raise KeyError("Bad operator expression '{}'.".format(key))
+    nodes = key.split('.')
+    op = nodes[-1]
+    if not op.startswith('$'):
+        raise KeyError("Bad operator placement '{}'.".format(key))
+    if op not in _INDEX_OPERATORS and op != '$exists':
+        raise KeyError("Unknown expression-operator '{}'.".format(op))
+    return '.'.join(nodes[:-1]), op
+
+
 def _check_logical_operator_argument(op, argument):
     if not isinstance(argument, list):
         raise ValueError("The argument of logical-operator '{}' must be a list!".format(op))
@@ -290,11 +540,14 @@ class Collection(object):
                 "First argument cannot be of str type. "
                 "Did you mean to use {}.open()?".format(type(self).__name__))
         self.index_rebuild_threshold = 0.1
+        self.direct_check_threshold = 0.1
         self._primary_key = primary_key
         self._file = io.StringIO()
         self._requires_flush = False
         self._dirty = set()
         self._indexes = dict()
+        self._sorted_indexes = dict()
+        self._indexed_values = dict()
         self._docs = dict()
         if docs is not None:
             for doc in docs:
@@ -319,16 +572,31 @@ class Collection(object):
                 return _id
         raise RuntimeError("Unable to determine default id.")
 
+    def _clear_indexes(self):
+        self._indexes.clear()
+        self._sorted_indexes.clear()
+        self._indexed_values.clear()
+
+    def _add_to_indexed_values(self, key, index):
+        "Record the values under which the documents of index are indexed for key."
+        for v, group in index.items():
+            for _id in group:
+                self._indexed_values.setdefault(_id, dict()).setdefault(key, []).append(v)
+
     def _remove_from_indexes(self, _id):
-        for index in self._indexes.values():
-            remove_keys = set()
-            for key, group in index.items():
-                if _id in group:    # faster than exception handling (performance)
-                    group.remove(_id)
+        # Only the index groups that the document is part of are visited.
+        for index_key, values in self._indexed_values.pop(_id, dict()).items():
+            index = self._indexes[index_key]
+            sorted_values = self._sorted_indexes.get(index_key)
+            for key in values:
+                group = index.get(key)
+                if group is None:
+                    continue
+                group.discard(_id)
                 if not len(group):
-                    remove_keys.add(key)
-            for key in remove_keys:
-                del index[key]
+                    del index[key]
+                    if sorted_values is not None:
+                        sorted_values.remove(key)
 
     def _update_indexes(self):
         if self._dirty:
@@ -336,16 +604,29 @@ class Collection(object):
                 self._remove_from_indexes(_id)
             docs = [self[_id] for _id in self._dirty]
             for key, index in self._indexes.items():
+                sorted_values = self._sorted_indexes.get(key)
                 tmp = _build_index(docs, key, self._primary_key)
                 for v, group in tmp.items():
+                    if sorted_values is not None and v not in index:
+                        sorted_values.add(v)
                     index[v].update(group)
+                self._add_to_indexed_values(key, tmp)
             self._dirty.clear()
 
     def _build_index(self, key):
         logger.debug("Building index for key '{}'...".format(key))
         self._indexes[key] = _build_index(self._docs.values(), key, self._primary_key)
+        self._sorted_indexes.pop(key, None)
+        self._add_to_indexed_values(key, self._indexes[key])
         logger.debug("Built index for key '{}'.".format(key))
 
+    def _sorted_index(self, key):
+        "Return the index for key and the sorted values of the index."
+        index = self.index(key, build=True)
+        if key not in self._sorted_indexes:
+            self._sorted_indexes[key] = _SortedValues(index)
+        return index, self._sorted_indexes[key]
+
     def index(self, key, build=False):
         """Get (and optionally build) the index for a given key.
 
@@ -379,7 +660,7 @@ class Collection(object):
         elif key in self._indexes:
             if len(self._dirty) > self.index_rebuild_threshold * len(self):
                 logger.debug("Indexes outdated, rebuilding...")
-                self._indexes.clear()
+                self._clear_indexes()
                 self._build_index(key)
                 self._dirty.clear()
             else:
@@ -489,7 +770,7 @@ class Collection(object):
     def clear(self):
         "Remove all documents from the collection."
         self._docs.clear()
-        self._indexes.clear()
+        self._clear_indexes()
         self._dirty.clear()
         self._requires_flush = True
 
@@ -518,37 +799,140 @@ class Collection(object):
         if not _valid_filter(filter):
             raise ValueError(filter)
 
-    def _find_expression(self, key, value):
-        logger.debug("Find documents for expression '{}: {}'.".format(key, value))
-        if '$' in key:
-            if key.count('$') > 1:
-                raise KeyError("Bad operator expression '{}'.".format(key))
-            nodes = key.split('.')
-            op = nodes[-1]
-            if not op.startswith('$'):
-                raise KeyError("Bad operator placement '{}'.".format(key))
-            key = '.'.join(nodes[:-1])
-            if op in _INDEX_OPERATORS:
-                index = self.index(key, build=True)
-                return _find_with_index_operator(index, op, value)
-            elif op == '$exists':
-                if not isinstance(value, bool):
-                    raise ValueError("The value of the '$exists' operator must be boolean.")
-                index = self.index(key, build=True)
-                match = {elem for elems in index.values() for elem in elems}
-                return match if value else set(self.ids).difference(match)
-            else:
-                raise KeyError("Unknown expression-operator '{}'.".format(op))
+    def _get_index(self, key, candidates=None):
+        """Return the index for key.
+
+        If candidates is provided, a temporary index of only these documents
+        is returned instead of building the index for the whole collection.
+        """
+        if candidates is None:
+            return self.index(key, build=True)
+        return _build_index([self._docs[_id] for _id in candidates], key, self._primary_key)
+
+    def _get_sorted_index(self, key, candidates=None):
+        if candidates is None:
+            return self._sorted_index(key)
+        index = self._get_index(key, candidates)
+        return index, _SortedValues(index)
+
+    def _find_expression(self, key, op, value, candidates=None):
+        """Find the ids of all documents that match the expression.
+
+        If candidates is provided, the returned ids are only guaranteed to
+        be correct with respect to these candidates.
+        """
+        logger.debug("Find documents for expression '{}: {}'.".format(
+            key if op is None else '.'.join((key, op)), value))
+        if op is None:
+            return self._get_index(key, candidates).get(value, set())
+        elif op in _RANGE_OPERATORS:
+            return self._find_range(key, [(op, value)], candidates)
+        elif op == '$near':
+            index, sorted_values = self._get_sorted_index(key, candidates)
+            return _find_near(index, sorted_values, value)
+        elif op in ('$eq', '$in', '$nin'):
+            return self._find_in(key, op, value, candidates)
+        elif op in _INDEX_OPERATORS:
+            index = self._get_index(key, candidates)
+            return _find_with_index_operator(index, op, value)
+        else:
+            assert op == '$exists'
+            if not isinstance(value, bool):
+                raise ValueError("The value of the '$exists' operator must be boolean.")
+            index = self._get_index(key, candidates)
+            match = {elem for elems in index.values() for elem in elems}
+            if value:
+                return match
+            return set(self.ids if candidates is None else candidates).difference(match)
+
+    def _find_in(self, key, op, argument, candidates=None):
+        index = self._get_index(key, candidates)
+        match = _find_in(index, [argument] if op == '$eq' else argument)
+        if match is None:
+            return _find_with_index_operator(index, op, argument)
+        elif op == '$nin':
+            return {_id for _ids in index.values() for _id in _ids}.difference(match)
         else:
-            index = self.index(key, build=True)
-            return index.get(value, set())
+            return match
+
+    def _find_range(self, key, conditions, candidates=None):
+        logger.debug("Find documents for range '{}: {}'.".format(key, conditions))
+        index, sorted_values = self._get_sorted_index(key, candidates)
+        match = _find_range(index, sorted_values, conditions)
+        if match is None:   # The arguments are neither numbers nor strings.
+            for op, argument in conditions:
+                op_match = _find_with_index_operator(index, op, argument)
+                match = op_match if match is None else match.intersection(op_match)
+        return match
+
+    def _estimate(self, key, op, argument):
+        """Estimate the number of documents that match an expression.
+
+        The estimate is based on the group sizes and the number of distinct
+        values of the index for key if it was already built, and on default
+        selectivities otherwise.
+        """
+        n = len(self)
+        index = self._indexes.get(key)
+        if op in (None, '$eq', '$in'):
+            values = argument if op == '$in' else [argument]
+            if not isinstance(values, (list, tuple)):
+                return n * _DEFAULT_SELECTIVITY
+            if index is None:
+                return min(n, len(values) * n * _EQUALITY_SELECTIVITY)
+            estimate = 0
+            for value in values:
+                try:
+                    estimate += len(index.get(_to_tuples(value), ()))
+                except TypeError:
+                    pass
+            return estimate
+        elif op == _RANGE:
+            sorted_values = self._sorted_indexes.get(key)
+            if index is None or sorted_values is None:
+                return n * _RANGE_SELECTIVITY
+            values = _range_values(sorted_values, argument)
+            if values is None:
+                return n * _RANGE_SELECTIVITY
+            return n * len(values) / float(max(1, len(index)))
+        elif op == '$near':
+            return n * _RANGE_SELECTIVITY
+        elif op in ('$ne', '$nin'):
+            return n
+        else:
+            return n * _DEFAULT_SELECTIVITY
+
+    def _plan(self, expr):
+        """Return the steps to evaluate the non-logical expressions of expr.
 
-    def _find_result(self, expr):
+        Each step is a (estimate, key, op, argument) tuple and the steps are
+        ordered by their estimated number of matches. All range operators
+        for the same key are combined into a single step.
+        """
+        steps = []
+        ranges = defaultdict(list)
+        for key, value in _traverse_filter(expr):
+            key, op = _split_operator(key)
+            if op in _RANGE_OPERATORS:
+                ranges[key].append((op, value))
+            else:
+                steps.append((self._estimate(key, op, value), key, op, value))
+        for key, conditions in ranges.items():
+            steps.append((self._estimate(key, _RANGE, conditions), key, _RANGE, conditions))
+        steps.sort(key=lambda step: (step[0], step[1] not in self._indexes))
+        return steps
+
+    def _find_result(self, expr, candidates=None, plan=None):
+        """Find the ids of all documents that match the expression.
+
+        :param candidates: The ids of the documents that are known to be the
+            only possible matches. The returned ids are only guaranteed to be
+            correct with respect to these candidates.
+        :param plan: A list to which the executed steps are appended.
+        """
         result = None
         if not len(expr):
             return set(self.ids)    # Empty expression yields all ids...
-        else:
-            result = None
 
         def _reduce_result(result, match):
             if result is None:  # First match
@@ -556,44 +940,101 @@ class Collection(object):
             else:               # Update previous match
                 return result.intersection(match)
 
+        def _step(method, key, op, argument, estimate=None, steps=None):
+            if plan is not None:
+                step = dict(key=key, operator=op, argument=argument, method=method,
+                            estimate=estimate, candidates=None, matches=None, time=None)
+                candidates_ = candidates if result is None else result
+                if candidates_ is not None:
+                    step['candidates'] = len(candidates_)
+                if steps is not None:
+                    step['steps'] = steps
+                plan.append(step)
+                return step
+
+        def _finish(step, start):
+            if step is not None:
+                step['matches'] = len(result)
+                step['time'] = time.time() - start
+
         # Check if filter contains primary key, in which case we can
         # immediately reduce the result.
         _id = expr.pop(self._primary_key, None)
         if _id is not None and _id in self:
+            start = time.time()
+            step = _step('primary key', self._primary_key, None, _id, estimate=1)
             result = _reduce_result(result, {_id})
+            _finish(step, start)
 
         # Extract all logical-operator expressions for now.
         or_expressions = expr.pop('$or', None)
         and_expressions = expr.pop('$and', None)
         not_expression = expr.pop('$not', None)
 
-        # Reduce the result based on the remaining non-logical expression:
-        for key, value in _traverse_filter(expr):
-            result = _reduce_result(result, self._find_expression(key, value))
+        # Reduce the result based on the remaining non-logical expressions,
+        # evaluating the most selective expressions first. Expressions for
+        # keys without index are checked directly against a small enough set
+        # of candidate documents instead of building the index.
+        for estimate, key, op, argument in self._plan(expr):
+            start = time.time()
+            candidates_ = candidates if result is None else result
+            if candidates_ is not None and key not in self._indexes and \
+                    len(candidates_) <= self.direct_check_threshold * len(self):
+                method = 'check'
+            else:
+                method, candidates_ = 'index', None
+            step = _step(method, key, op, argument, estimate=estimate)
+            if op == _RANGE:
+                match = self._find_range(key, argument, candidates_)
+            else:
+                match = self._find_expression(key, op, argument, candidates_)
+            result = _reduce_result(result, match)
+            _finish(step, start)
             if not result:          # No match, no need to continue...
                 return set()
 
         # Reduce the result based on the logical-operator expressions:
         if not_expression is not None:
-            not_match = self._find_result(not_expression)
+            start = time.time()
+            steps = None if plan is None else []
+            step = _step('$not', None, '$not', not_expression, steps=steps)
+            not_match = self._find_result(
+                not_expression, candidates if result is None else result, steps)
             result = _reduce_result(result, set(self.ids).difference(not_match))
+            _finish(step, start)
 
         if and_expressions is not None:
             _check_logical_operator_argument('$and', and_expressions)
+            start = time.time()
+            steps = None if plan is None else []
+            step = _step('$and', None, '$and', and_expressions, steps=steps)
             for expr_ in and_expressions:
-                result = _reduce_result(result, self._find_result(expr_))
+                steps_ = None if plan is None else []
+                result = _reduce_result(result, self._find_result(
+                    expr_, candidates if result is None else result, steps_))
+                if steps is not None:
+                    steps.append(steps_)
+            _finish(step, start)
 
         if or_expressions is not None:
             _check_logical_operator_argument('$or', or_expressions)
+            start = time.time()
+            steps = None if plan is None else []
+            step = _step('$or', None, '$or', or_expressions, steps=steps)
             or_results = set()
             for expr_ in or_expressions:
-                or_results.update(self._find_result(expr_))
+                steps_ = None if plan is None else []
+                or_results.update(self._find_result(
+                    expr_, candidates if result is None else result, steps_))
+                if steps is not None:
+                    steps.append(steps_)
             result = _reduce_result(result, or_results)
+            _finish(step, start)
 
         assert result is not None
         return result
 
-    def _find(self, filter=None, limit=0):
+    def _find(self, filter=None, limit=0, plan=None):
         """Returns a result vector of ids for the given filter and limit.
 
         This function normalizes the filter argument and then attempts to
@@ -610,20 +1051,25 @@ class Collection(object):
                all documents will match an empty filter.
             2. If the filter argument contains a primary key, the result
                is directly returned since no search operation is necessary.
-            3. The filter is processed key by key, once the result vector is
+            3. The filter is processed key by key in the order of the
+               estimated number of matches, once the result vector is
                empty it is immediately returned.
+            4. Keys without an index are checked directly for the
+               documents of a small enough result vector instead of
+               building the index.
 
         :param filter: The filter argument that all documents must match.
         :param limit: Limit the size of the result vector.
+        :param plan: A list to which the executed query steps are appended.
         :raises ValueError: In case that the filter argument is invalid.
         :returns: A set of ids of documents that match the given filter.
         """
         self._assert_open()
-        filter = json.loads(json.dumps(filter))  # Normalize
+        filter = _normalize_filter(filter)
         self._check_filter(filter)
         if filter is None or not len(filter):
             return set(islice(self._docs.keys(), limit if limit else None))
-        result = self._find_result(filter)
+        result = self._find_result(filter, plan=plan)
         return set(islice(result, limit if limit else None))
 
     def find(self, filter=None, limit=0):
@@ -731,6 +1177,8 @@ class Collection(object):
                         project.find({"foo": {"$where": "lambda x: x.startswith('bar')"}})
 
             Matches all docs, where the value for foo starts with the word 'bar'.
+            Instead of a string, the argument may also be a callable, e.g.,
+            ``{"foo": {"$where": lambda x: x.startswith('bar')}}``.
 
         :param filter: All documents must match the given filter.
         :type filter: Mapping
@@ -760,6 +1208,44 @@ class Collection(object):
         for doc in self.find(filter, limit=1):
             return doc
 
+    def explain(self, filter=None):
+        """Execute the query for filter and return the executed steps.
+
+        The expressions of a filter are evaluated in the order of their
+        estimated number of matches, which is based on the statistics of
+        existing indexes. This method allows to inspect this plan:
+
+        .. code-block:: python
+
+            for step in collection.explain({'a': 0, 'b': {'$gt': 1}}):
+                print(step['key'], step['operator'], step['method'], step['time'])
+
+        Each step is a dict with the following items:
+
+            * *key*, *operator*, *argument*: The evaluated expression, the
+              operator is None for equality and '$range' for the combined
+              range operators of a key.
+            * *method*: 'index' if the expression was evaluated with the
+              index for the key, 'check' if it was checked directly for the
+              candidate documents, 'primary key', or one of the logical
+              operators.
+            * *estimate*: The estimated number of matches.
+            * *candidates*: The number of candidate documents before the
+              step or None for the first step.
+            * *matches*: The number of remaining candidates after the step.
+            * *time*: The duration of the step in seconds.
+            * *steps*: The steps of the sub-expressions of logical operators.
+
+        Steps that are not executed, because no documents remain, are omitted.
+
+        :param filter: The filter argument that all documents must match.
+        :raises ValueError: In case that the filter argument is invalid.
+        :returns: A list of query steps.
+        """
+        plan = []
+        self._find(filter, plan=plan)
+        return plan
+
     def replace_one(self, filter, replacement, upsert=False):
         """Replace one document that matches the given filter.
 
@@ -906,7 +1392,7 @@ class Collection(object):
                 self.flush()
             finally:
                 self._file.close()
-                self._indexes.clear()
+                self._clear_indexes()
                 self._docs = None
                 self._file = None
 
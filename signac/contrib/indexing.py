@@ -12,9 +12,11 @@ from time import sleep
 from collections import defaultdict
 
 from ..core.json import json
+from ..core.codec import decode, document_filenames
 from ..common import six
 from ..common import errors
 from .utility import walkdepth, is_string
+from .utility import _job_workspace_path, _iter_job_dirs
 from .hashing import calc_id
 
 if six.PY2:
@@ -306,24 +308,24 @@ def _index_signac_project_workspace(root,
                                     statepoint_index='statepoint',
                                     signac_id_alias='_id',
                                     encoding='utf-8',
-                                    statepoint_dict=None):
+                                    statepoint_dict=None,
+                                    sharding=0):
     "Yields standard index documents for a signac project workspace."
     logger.debug("Indexing workspace '{}'...".format(root))
     m = re.compile(r'[a-f0-9]{32}')
     try:
-        job_ids = [jid for jid in os.listdir(root) if m.match(jid)]
+        job_ids = list(_iter_job_dirs(root, m, sharding))
     except OSError as error:
         if error.errno == errno.ENOENT:
             return
         else:
             raise
     for i, job_id in enumerate(job_ids):
-        if not m.match(job_id):
-            continue
+        wd = _job_workspace_path(root, job_id, sharding)
         doc = {'signac_id': job_id, KEY_PATH: root}
         if signac_id_alias:
             doc[signac_id_alias] = job_id
-        fn_sp = os.path.join(root, job_id, fn_statepoint)
+        fn_sp = os.path.join(wd, fn_statepoint)
         with open(fn_sp, 'rb') as file:
             sp = json.loads(file.read().decode(encoding))
             if statepoint_dict is not None:
@@ -333,13 +335,16 @@ def _index_signac_project_workspace(root,
             else:
                 doc.update(sp)
         if include_job_document:
-            fn_doc = os.path.join(root, job_id, fn_job_document)
-            try:
-                with open(fn_doc, 'rb') as file:
-                    doc.update(json.loads(file.read().decode(encoding)))
-            except IOError as error:
-                if error.errno != errno.ENOENT:
-                    raise
+            # Binary documents are stored with the suffix of their codec.
+            for fn_doc in document_filenames(fn_job_document):
+                try:
+                    with open(os.path.join(wd, fn_doc), 'rb') as file:
+                        doc.update(decode(file.read(), encoding))
+                except IOError as error:
+                    if error.errno != errno.ENOENT:
+                        raise
+                else:
+                    break
         yield doc
     if job_ids:
         logger.debug("Indexed workspace '{}', {} entries.".format(root, i+1))
@@ -364,15 +369,21 @@ class SignacProjectCrawler(RegexFileCrawler):
 
     def __init__(self, root):
         from .project import get_project
-        root = get_project(root=root).workspace()
+        project = get_project(root=root)
+        self._sharding = project._sharding
         self._statepoints = dict()
-        return super(SignacProjectCrawler, self).__init__(root=root)
+        return super(SignacProjectCrawler, self).__init__(root=project.workspace())
 
     def _get_job_id(self, dirpath):
-        return os.path.relpath(dirpath, self.root).split('/')[0]
+        "Return the id of the job containing dirpath or None for paths outside of a job."
+        relpath = os.path.normpath(os.path.relpath(dirpath, self.root))
+        parts = [] if relpath == os.curdir else relpath.split(os.sep)
+        if len(parts) > self._sharding:
+            return parts[self._sharding]
 
     def _read_statepoint(self, job_id):
-        fn_sp = os.path.join(self.root, job_id, self.fn_statepoint)
+        fn_sp = os.path.join(
+            _job_workspace_path(self.root, job_id, self._sharding), self.fn_statepoint)
         with open(fn_sp, 'rb') as file:
             return json.loads(file.read().decode(self.encoding))
 
@@ -386,8 +397,8 @@ class SignacProjectCrawler(RegexFileCrawler):
         return job_id, self._get_statepoint(self, job_id)
 
     def process(self, doc, dirpath, fn):
-        if dirpath is not None:
-            job_id = self._get_job_id(dirpath)
+        job_id = None if dirpath is None else self._get_job_id(dirpath)
+        if job_id is not None:
             statepoint = self._get_statepoint(job_id)
             doc['signac_id'] = job_id
             if self.statepoint_index:
@@ -404,7 +415,8 @@ class SignacProjectCrawler(RegexFileCrawler):
                 statepoint_index=self.statepoint_index,
                 signac_id_alias=self.signac_id_alias,
                 encoding=self.encoding,
-                statepoint_dict=self._statepoints):
+                statepoint_dict=self._statepoints,
+                sharding=self._sharding):
                 yield self.process(doc, None, None)
         for doc in super(SignacProjectCrawler, self).crawl(depth=depth):
             yield doc
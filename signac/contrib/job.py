@@ -11,6 +11,8 @@ from ..common import six
 from ..core.json import json
 from ..core.attrdict import SyncedAttrDict
 from ..core.jsondict import JSONDict
+from ..core.codec import decode, document_filenames, find_document
+from ..core.arraystore import ArrayStore
 from .hashing import calc_id
 from .utility import _mkdir_p
 from .errors import DestinationExistsError, JobsCorruptedError
@@ -50,18 +52,49 @@ class Job(object):
     FN_DOCUMENT = 'signac_job_document.json'
     "The job's document filename."
 
-    def __init__(self, project, statepoint, _trust=False):
+    FN_DATA = 'signac_data'
+    "The name of the directory of the job's array store."
+
+    # The synced state point, the workspace path, and the document handle are
+    # only created on first access, since most jobs are only used to look up
+    # their id or workspace path.
+    __slots__ = ('_project', '_statepoint', '_id', '_sp', '_workspace', '_document', '_cwd',
+                 '__weakref__')
+
+    def __init__(self, project, statepoint, _trust=False, _id=None):
         self._project = project
         if _trust:
-            self._statepoint = dict(statepoint)
+            # Trusted state points are not modified, they are only referenced.
+            self._statepoint = statepoint
         else:
             self._statepoint = json.loads(json.dumps(statepoint))
-        self._id = calc_id(self._statepoint)
-        self._sp = SyncedAttrDict(self._statepoint, parent=_sp_save_hook(self))
-        self._wd = os.path.join(project.workspace(), self._id)
-        self._fn_doc = os.path.join(self._wd, self.FN_DOCUMENT)
+        self._id = calc_id(self._statepoint) if _id is None else _id
+        self._sp = None
+        self._workspace = None
         self._document = None
-        self._cwd = list()
+        self._cwd = None
+
+    def __getstate__(self):
+        state = {'project': self._project, 'statepoint': self._statepoint, 'id': self._id}
+        # Subclasses without __slots__ may have additional attributes.
+        state['dict'] = getattr(self, '__dict__', None)
+        return state
+
+    def __setstate__(self, state):
+        self.__init__(state['project'], state['statepoint'], _trust=True, _id=state['id'])
+        if state.get('dict'):
+            self.__dict__.update(state['dict'])
+
+    @property
+    def _wd(self):
+        if self._workspace is None:
+            self._workspace = self._project._get_job_workspace(self._id)
+        return self._workspace
+
+    def _find_document(self):
+        "Return the filename and the codec of the job document."
+        return find_document(
+            os.path.join(self._wd, self.FN_DOCUMENT), self._project._document_codec)
 
     def get_id(self):
         """The unique identifier for the job's statepoint.
@@ -121,6 +154,7 @@ class Job(object):
         try:
             os.rename(fn_manifest, fn_manifest_backup)
             try:
+                _mkdir_p(os.path.dirname(dst.workspace()))
                 os.rename(self.workspace(), dst.workspace())
             except OSError as error:
                 os.rename(fn_manifest_backup, fn_manifest)  # rollback
@@ -139,11 +173,10 @@ class Job(object):
             # Update this instance
             self._statepoint = dst._statepoint
             self._id = dst._id
-            self._sp = SyncedAttrDict(self._statepoint, parent=_sp_save_hook(self))
-            self._wd = dst._wd
-            self._fn_doc = dst._fn_doc
+            self._sp = None
+            self._workspace = dst._workspace
             self._document = None
-            self._cwd = list()
+            self._cwd = None
             logger.info("Moved '{}' -> '{}'.".format(self, dst))
 
     def _reset_sp(self, new_sp=None):
@@ -206,8 +239,8 @@ class Job(object):
 
     def _read_document(self):
         try:
-            with open(self._fn_doc, 'rb') as file:
-                return json.loads(file.read().decode())
+            with open(self._find_document()[0], 'rb') as file:
+                return decode(file.read())
         except IOError as error:
             if error.errno != errno.ENOENT:
                 raise
@@ -216,15 +249,16 @@ class Job(object):
     def _reset_document(self, new_doc):
         if not isinstance(new_doc, Mapping):
             raise ValueError("The document must be a mapping.")
-        dirname, filename = os.path.split(self._fn_doc)
+        fn_doc, codec = self._find_document()
+        dirname, filename = os.path.split(fn_doc)
         fn_tmp = os.path.join(dirname, '._{uid}_{fn}'.format(
             uid=uuid.uuid4(), fn=filename))
         with open(fn_tmp, 'wb') as tmpfile:
-            tmpfile.write(json.dumps(new_doc).encode())
+            tmpfile.write(codec.encode(new_doc))
         if six.PY2:
-            os.rename(fn_tmp, self._fn_doc)
+            os.rename(fn_tmp, fn_doc)
         else:
-            os.replace(fn_tmp, self._fn_doc)
+            os.replace(fn_tmp, fn_doc)
 
     @property
     def document(self):
@@ -234,7 +268,8 @@ class Job(object):
         :rtype: :class:`~.JSONDict`"""
         if self._document is None:
             self.init()
-            self._document = JSONDict(filename=self._fn_doc, write_concern=True)
+            fn_doc, codec = self._find_document()
+            self._document = JSONDict(filename=fn_doc, write_concern=True, codec=codec)
         return self._document
 
     @document.setter
@@ -249,6 +284,27 @@ class Job(object):
     def doc(self, new_doc):
         self.document = new_doc
 
+    @property
+    def data(self):
+        """The array store associated with this job.
+
+        Arrays are stored as NumPy (.npy) files in the job's workspace and
+        opened as read-only memory maps, which means that only the accessed
+        parts of an array are read:
+
+        .. code-block:: python
+
+            job.data['energy'] = numpy.zeros(1000000)
+            job.data['energy'][:100].mean()
+            job.data.write('energy', slice(0, 10), 1.0)
+
+        This property requires the numpy package.
+
+        :return: The job's array store.
+        :rtype: :class:`~signac.core.arraystore.ArrayStore`"""
+        self.init()
+        return ArrayStore(os.path.join(self._wd, self.FN_DATA))
+
     def init(self, force=False):
         """Initialize the job's workspace directory.
 
@@ -269,6 +325,7 @@ class Job(object):
                          "workspace directory for job '{}'.".format(self))
             raise
 
+        created = False
         try:
             # Ensure to create the binary to write before file creation
             blob = json.dumps(self._statepoint, indent=2)
@@ -289,9 +346,11 @@ class Job(object):
                     else:
                         with os.fdopen(fd, 'w') as file:
                             file.write(blob)
+                        created = True
                 else:
                     with open(fn_manifest, 'w' if force else 'x') as file:
                         file.write(blob)
+                    created = True
             except IOError as error:
                 if not error.errno == errno.EEXIST:
                     raise
@@ -303,7 +362,9 @@ class Job(object):
                 pass
             raise error
         else:
-            self._check_manifest()
+            # A manifest file that was just written does not need to be checked.
+            if not created:
+                self._check_manifest()
 
     def _check_manifest(self):
         "Check whether the manifest file, if it exists, is correct."
@@ -328,7 +389,7 @@ class Job(object):
         """
         try:
             for fn in os.listdir(self._wd):
-                if fn in (self.FN_MANIFEST, self.FN_DOCUMENT):
+                if fn == self.FN_MANIFEST or fn in document_filenames(self.FN_DOCUMENT):
                     continue
                 path = os.path.join(self._wd, fn)
                 if os.path.isfile(path):
@@ -378,12 +439,14 @@ class Job(object):
         :raises DestinationExistsError: If the job is already initialized in project.
         """
         dst = project.open_job(self.statepoint())
-        _mkdir_p(project.workspace())
+        _mkdir_p(os.path.dirname(dst.workspace()))
         try:
             os.rename(self.workspace(), dst.workspace())
         except OSError:
             raise DestinationExistsError(dst)
-        self.__dict__.update(dst.__dict__)
+        self._project = dst._project
+        self._workspace = dst._workspace
+        self._document = None
 
     def sync(self, other, strategy=None, exclude=None, doc_sync=None, **kwargs):
         """Perform a one-way synchronization of this job with the other job.
@@ -464,6 +527,8 @@ class Job(object):
         Opening the context will switch into the job's workspace,
         leaving it will switch back to the previous working directory.
         """
+        if self._cwd is None:
+            self._cwd = list()
         self._cwd.append(os.getcwd())
         self.init()
         logger.info("Enter workspace '{}'.".format(self._wd))
@@ -471,11 +536,9 @@ class Job(object):
 
     def close(self):
         "Close the job and switch to the previous working directory."
-        try:
+        if self._cwd:
             os.chdir(self._cwd.pop())
             logger.info("Leave workspace.")
-        except IndexError:
-            pass
 
     def __enter__(self):
         self.open()
@@ -10,24 +10,34 @@ import warnings
 import errno
 import collections
 import uuid
-import gzip
 import time
+import sqlite3
+import weakref
 from itertools import chain, groupby
 from multiprocessing.pool import ThreadPool
 
 from .. import syncutil
 from ..core.json import json
 from ..core.jsondict import JSONDict
+from ..core.jsondict import _file_signature, _recently_modified
+from ..core.codec import get_codec, decode
+from ..core.codec import document_filename, document_filenames, find_document
+from ..core.codec import _check_unambiguous
 from .collection import Collection
 from .collection import _traverse_filter
 from ..common import six
 from ..common.config import load_config
+from ..common.config import read_config_file, CONFIG_FILENAMES
 from ..sync import sync_projects
 from .job import Job
 from .hashing import calc_id
+from .cache import StatepointCache
 from .indexing import SignacProjectCrawler
 from .indexing import MasterCrawler
 from .utility import _mkdir_p, split_and_print_progress
+from .utility import _bounded_imap, _print_throughput
+from .utility import _SHARD_WIDTH, _job_workspace_path, _iter_job_dirs, _remove_tree
+from .utility import _job_shards
 from .schema import ProjectSchema
 from .errors import WorkspaceError
 from .errors import DestinationExistsError
@@ -126,9 +136,12 @@ class Project(object):
     FN_STATEPOINTS = 'signac_statepoints.json'
     "The default filename to read from and write statepoints to."
 
-    FN_CACHE = '.signac_sp_cache.json.gz'
+    FN_CACHE = '.signac_sp_cache.db'
     "The default filename for the state point cache file."
 
+    FN_CACHE_LEGACY = '.signac_sp_cache.json.gz'
+    "The filename of the state point cache file used by previous versions."
+
     def __init__(self, config=None):
         if config is None:
             config = load_config()
@@ -148,6 +161,12 @@ class Project(object):
         self._sp_cache_warned = False
         self._sp_cache_miss_warning_threshold = self._config.get(
             'statepoint_cache_miss_warning_threshold', 500)
+        self._persistent_cache = None
+        self._ws_snapshot = tuple()
+        self._ws_snapshot_signature = None
+        self._index_cache_ids = None
+        self._doc_cache = dict()
+        self._job_cache = weakref.WeakValueDictionary()
 
     def __str__(self):
         "Returns the project's id."
@@ -164,6 +183,15 @@ class Project(object):
     def __eq__(self, other):
         return repr(self) == repr(other)
 
+    def __getstate__(self):
+        state = dict(self.__dict__)
+        del state['_job_cache']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._job_cache = weakref.WeakValueDictionary()
+
     @property
     def config(self):
         "The project's configuration."
@@ -201,6 +229,20 @@ class Project(object):
             such as $HOME."""
         return self._wd
 
+    @property
+    def _sharding(self):
+        "The number of shard directory levels of the workspace."
+        return int(self._config.get('workspace_sharding', 0))
+
+    @property
+    def _document_codec(self):
+        "The codec used to encode job and project documents."
+        return get_codec(self._config.get('document_codec'))
+
+    def _get_job_workspace(self, jobid):
+        "Return the path of the workspace directory of the job with the given id."
+        return _job_workspace_path(self._wd, jobid, self._sharding)
+
     def get_id(self):
         """Get the project identifier.
 
@@ -254,15 +296,16 @@ class Project(object):
     def _reset_document(self, new_doc):
         if not isinstance(new_doc, Mapping):
             raise ValueError("The document must be a mapping.")
-        dirname, filename = os.path.split(self._fn_doc)
+        fn_doc, codec = find_document(self._fn_doc, self._document_codec)
+        dirname, filename = os.path.split(fn_doc)
         fn_tmp = os.path.join(dirname, '._{uid}_{fn}'.format(
             uid=uuid.uuid4(), fn=filename))
         with open(fn_tmp, 'wb') as tmpfile:
-            tmpfile.write(json.dumps(new_doc).encode())
+            tmpfile.write(codec.encode(new_doc))
         if six.PY2:
-            os.rename(fn_tmp, self._fn_doc)
+            os.rename(fn_tmp, fn_doc)
         else:
-            os.replace(fn_tmp, self._fn_doc)
+            os.replace(fn_tmp, fn_doc)
 
     @property
     def document(self):
@@ -272,7 +315,8 @@ class Project(object):
         :rtype: :class:`~.JSONDict`
         """
         if self._document is None:
-            self._document = JSONDict(filename=self._fn_doc, write_concern=True)
+            fn_doc, codec = find_document(self._fn_doc, self._document_codec)
+            self._document = JSONDict(filename=fn_doc, write_concern=True, codec=codec)
         return self._document
 
     @document.setter
@@ -320,24 +364,212 @@ class Project(object):
                 "You need to either provide the statepoint or the id.")
         if id is None:
             job = self.Job(project=self, statepoint=statepoint)
+            cached = self._get_cached_job(job.get_id())
+            if cached is not None:
+                return cached
         else:
             if len(id) < 32:
-                job_ids = self.find_job_ids()
-                matches = [_id for _id in job_ids if _id.startswith(id)]
+                matches = self._find_job_ids_by_prefix(id)
                 if len(matches) == 1:
                     id = matches[0]
                 elif len(matches) > 1:
                     raise LookupError(id)
-            job = self.Job(project=self, statepoint=self.get_statepoint(id), _trust=True)
+            if id in self._sp_cache:
+                # The id does not need to be recalculated for a cached state point.
+                cached = self._get_cached_job(id)
+                if cached is not None:
+                    return cached
+                job = self.Job(project=self, statepoint=self._sp_cache[id], _trust=True, _id=id)
+            else:
+                job = self.Job(project=self, statepoint=self.get_statepoint(id), _trust=True)
+        self._job_cache[job.get_id()] = job
         if job.get_id() not in self._sp_cache:
             self._register(job)
         return job
 
+    def _get_cached_job(self, jobid):
+        """Return the job instance with the given id, which is still in use, or None.
+
+        Instances that have been moved to another project or were reset to
+        another state point since they were opened are ignored. If the job's
+        workspace was removed in the meantime, the instance's document is
+        opened again and the job initialized again on the next access.
+        """
+        job = self._job_cache.get(jobid)
+        if job is not None and job._id == jobid and job._project is self:
+            if job._document is not None and not os.path.isdir(job._wd):
+                job._document = None
+            return job
+
+    def init_jobs(self, statepoints, workers=None):
+        """Initialize the jobs associated with multiple state points.
+
+        This method is equivalent to calling ``project.open_job(sp).init()``
+        for each state point, but normalizes all state points at once,
+        initializes the job workspaces concurrently, and registers all
+        state points with the internal and the persistent state point
+        cache in a single operation.
+
+        :param statepoints: The state points of the jobs to initialize.
+        :type statepoints: iterable of mappings
+        :param workers: The number of threads used to initialize the jobs,
+            defaults to the 'init_jobs_num_workers' configuration value or 16.
+        :type workers: int
+        :return: The initialized jobs in the order of the provided state points.
+        :rtype: list
+        """
+        if workers is None:
+            workers = int(self._config.get('init_jobs_num_workers', 16))
+        statepoints = json.loads(json.dumps(list(statepoints)))
+        jobs, instances = [], dict()
+        for sp in statepoints:
+            job = self.Job(project=self, statepoint=sp, _trust=True)
+            if job._id in instances:
+                job = instances[job._id]
+            else:
+                # Job instances that are still in use are returned as by open_job().
+                cached = self._get_cached_job(job._id)
+                if cached is None:
+                    self._job_cache[job._id] = job
+                else:
+                    job = cached
+                instances[job._id] = job
+            jobs.append(job)
+        unique = list(instances.values())
+
+        def _init(job):
+            job.init()
+
+        if workers > 1 and len(unique) > 1:
+            pool = ThreadPool(min(workers, len(unique)))
+            try:
+                for _ in _print_throughput(
+                        pool.imap_unordered(_init, unique), len(unique),
+                        write=logger.info, desc="Initialize jobs: "):
+                    pass
+            finally:
+                pool.terminate()
+        else:
+            for job in unique:
+                _init(job)
+
+        registered = {job._id: dict(job._statepoint) for job in unique}
+        self._sp_cache.update(registered)
+        persistent_cache = self._get_persistent_cache()
+        if persistent_cache is not None:
+            persistent_cache.update(registered)
+        return jobs
+
+    def _remove_or_clear_jobs(self, jobs, filter, doc_filter, workers, clear):
+        if jobs is None:
+            job_ids = self.find_job_ids(filter=filter, doc_filter=doc_filter)
+        elif filter is not None or doc_filter is not None:
+            raise ValueError("The jobs and filter arguments are mutually exclusive.")
+        else:
+            job_ids = list(set(str(job) for job in jobs))
+        if workers is None:
+            workers = int(self._config.get('remove_jobs_num_workers', 16))
+        keep = [self.Job.FN_MANIFEST] + document_filenames(self.Job.FN_DOCUMENT)
+        codec = self._document_codec
+
+        def _remove(_id):
+            wd = self._get_job_workspace(_id)
+            freed = 0
+            try:
+                if clear:
+                    for fn in os.listdir(wd):
+                        if fn in keep:
+                            continue
+                        path = os.path.join(wd, fn)
+                        if os.path.isdir(path) and not os.path.islink(path):
+                            freed += _remove_tree(path)
+                        else:
+                            freed += os.lstat(path).st_size
+                            os.remove(path)
+                    fn_doc, codec_ = find_document(os.path.join(wd, self.Job.FN_DOCUMENT), codec)
+                    JSONDict(filename=fn_doc, write_concern=True, codec=codec_).clear()
+                else:
+                    freed += _remove_tree(wd)
+            except (OSError, IOError) as error:
+                if error.errno != errno.ENOENT:
+                    raise
+            return freed
+
+        desc = "Clear jobs: " if clear else "Remove jobs: "
+        if workers > 1 and len(job_ids) > 1:
+            pool = ThreadPool(min(workers, len(job_ids)))
+            try:
+                freed = sum(_print_throughput(
+                    pool.imap_unordered(_remove, job_ids), len(job_ids),
+                    write=logger.info, desc=desc))
+            finally:
+                pool.terminate()
+        else:
+            freed = sum(_remove(_id) for _id in job_ids)
+
+        for _id in job_ids:
+            self._doc_cache.pop(_id, None)
+            # Job instances that are still in use open their document again.
+            job = self._job_cache.get(_id)
+            if job is not None:
+                job._document = None
+            if not clear:
+                self._sp_cache.pop(_id, None)
+                self._index_cache.pop(_id, None)
+        if not clear:
+            self._index_cache_ids = None
+            persistent_cache = self._get_persistent_cache()
+            if persistent_cache is not None:
+                persistent_cache.delete(job_ids)
+        logger.info("{} {} jobs, freed {} bytes.".format(
+            'Cleared' if clear else 'Removed', len(job_ids), freed))
+        return freed
+
+    def remove_jobs(self, jobs=None, filter=None, doc_filter=None, workers=None):
+        """Remove the workspaces of multiple jobs, including their job documents.
+
+        The jobs to remove are either provided explicitly or selected with
+        filters as for :meth:`find_jobs`. The job workspaces are removed
+        concurrently and all internal caches are updated once at the end.
+        Jobs that are not initialized are ignored.
+
+        .. warning::
+
+            Calling this method without any arguments removes all jobs.
+
+        :param jobs: The jobs or job ids of the jobs to remove.
+        :type jobs: iterable
+        :param filter: A mapping of key-value pairs that all
+            state points of jobs to remove are compared against.
+        :type filter: mapping
+        :param doc_filter: A mapping of key-value pairs that all
+            job documents of jobs to remove are compared against.
+        :type doc_filter: mapping
+        :param workers: The number of threads used to remove the jobs,
+            defaults to the 'remove_jobs_num_workers' configuration value or 16.
+        :type workers: int
+        :return: The number of freed bytes.
+        :rtype: int
+        :raises ValueError: If both jobs and filters are provided.
+        """
+        return self._remove_or_clear_jobs(jobs, filter, doc_filter, workers, clear=False)
+
+    def clear_jobs(self, jobs=None, filter=None, doc_filter=None, workers=None):
+        """Remove all data of multiple jobs, but not the jobs themselves.
+
+        This is the bulk equivalent of :meth:`~.Job.clear`, with the
+        same arguments as :meth:`remove_jobs`.
+
+        :return: The number of freed bytes.
+        :rtype: int
+        :raises ValueError: If both jobs and filters are provided.
+        """
+        return self._remove_or_clear_jobs(jobs, filter, doc_filter, workers, clear=True)
+
     def _job_dirs(self):
         try:
-            for d in os.listdir(self._wd):
-                if JOB_ID_REGEX.match(d):
-                    yield d
+            for d in _iter_job_dirs(self._wd, JOB_ID_REGEX, self._sharding):
+                yield d
         except OSError as error:
             if error.errno == errno.ENOENT:
                 if os.path.islink(self._wd):
@@ -353,9 +585,62 @@ class Project(object):
                 logger.error("Unable to access the workspace directory '{}'.".format(self._wd))
                 raise WorkspaceError(error)
 
+    def _workspace_signature(self):
+        """Return the inode and modification time of the workspace directory.
+
+        Returns None if the workspace does not exist or was modified too
+        recently for the modification time to reliably reflect all changes.
+        The signature of a sharded workspace is always None, since adding
+        or removing a job only modifies the corresponding shard directory.
+        """
+        if self._sharding:
+            return None
+        try:
+            st = os.stat(self._wd)
+        except OSError:
+            return None
+        if _recently_modified(st.st_mtime):
+            return None
+        return [st.st_ino, st.st_mtime]
+
+    def _find_job_ids_by_prefix(self, prefix):
+        "Return all ids of initialized jobs starting with prefix."
+        cache = self._get_persistent_cache()
+        if cache is not None:
+            signature = self._workspace_signature()
+            if signature is not None and signature == cache.get_meta('workspace'):
+                return cache.find_ids(prefix)
+        sharding = self._sharding
+        if sharding and len(prefix) >= sharding * _SHARD_WIDTH:
+            # All matching jobs are located within the same shard directory.
+            shard_dir = os.path.dirname(self._get_job_workspace(prefix))
+            try:
+                return [_id for _id in _iter_job_dirs(shard_dir, JOB_ID_REGEX)
+                        if _id.startswith(prefix)]
+            except OSError as error:
+                if error.errno not in (errno.ENOENT, errno.ENOTDIR):
+                    raise
+                return []
+        return [_id for _id in self._job_ids() if _id.startswith(prefix)]
+
+    def _job_ids(self):
+        """Return the ids of all initialized jobs as tuple.
+
+        The workspace directory is only listed when its inode or modification
+        time changed since the last listing. The same tuple is returned as
+        long as the workspace content does not change.
+        """
+        signature = self._workspace_signature()
+        if signature is None or signature != self._ws_snapshot_signature:
+            job_ids = tuple(self._job_dirs())
+            if job_ids != self._ws_snapshot:
+                self._ws_snapshot = job_ids
+            self._ws_snapshot_signature = signature
+        return self._ws_snapshot
+
     def num_jobs(self):
         "Return the number of initialized jobs."
-        return len(list(self._job_dirs()))
+        return len(self._job_ids())
 
     __len__ = num_jobs
 
@@ -367,7 +652,22 @@ class Project(object):
         :returns: True when the job is initialized for this project.
         :rtype: bool
         """
-        return job.get_id() in self.find_job_ids()
+        return os.path.isdir(self._get_job_workspace(job.get_id()))
+
+    def contains_many(self, jobs):
+        """Determine for multiple jobs whether they are in the project's data space.
+
+        In contrast to testing each job individually, this method lists
+        the workspace at most once.
+
+        :param jobs: The jobs or job ids to test for initialization.
+        :type jobs: iterable
+        :returns: A list of booleans in the order of the provided jobs, each
+            True when the corresponding job is initialized for this project.
+        :rtype: list
+        """
+        job_ids = set(self._job_ids())
+        return [str(job) in job_ids for job in jobs]
 
     def build_job_search_index(self, index, _trust=False):
         """Build a job search index.
@@ -483,12 +783,12 @@ class Project(object):
             by the index.
         """
         if filter is None and doc_filter is None and index is None:
-            return list(self._job_dirs())
+            return list(self._job_ids())
         if index is None:
             if doc_filter is None:
                 index = self._sp_index()
             else:
-                index = self.index(include_job_document=True)
+                index = self._build_index(include_job_document=True)
         search_index = self.build_job_search_index(index, _trust=True)
         return search_index.find_job_ids(filter=filter, doc_filter=doc_filter)
 
@@ -672,7 +972,7 @@ class Project(object):
                 raise
             tmp = dict()
         if statepoints is None:
-            job_ids = self._job_dirs()
+            job_ids = self._job_ids()
             _cache = {_id: self.get_statepoint(_id) for _id in job_ids}
         else:
             _cache = {calc_id(sp): sp for sp in statepoints}
@@ -688,12 +988,13 @@ class Project(object):
 
     def _get_statepoint_from_workspace(self, jobid):
         "Attempt to read the statepoint from the workspace."
-        fn_manifest = os.path.join(self._wd, jobid, self.Job.FN_MANIFEST)
+        wd = self._get_job_workspace(jobid)
+        fn_manifest = os.path.join(wd, self.Job.FN_MANIFEST)
         try:
             with open(fn_manifest, 'rb') as manifest:
                 return json.loads(manifest.read().decode())
         except (IOError, ValueError) as error:
-            if os.path.isdir(os.path.join(self._wd, jobid)):
+            if os.path.isdir(wd):
                 logger.error(
                     "Error while trying to access state "
                     "point manifest file of job '{}': '{}'.".format(jobid, error))
@@ -725,12 +1026,12 @@ class Project(object):
             If the state point manifest file corresponding to jobid is
             inaccessible or corrupted.
         """
-        if not self._sp_cache:
-            self._read_cache()
-        try:
-            if jobid in self._sp_cache:
-                return self._sp_cache[jobid]
-            else:
+        if jobid in self._sp_cache:
+            return self._sp_cache[jobid]
+        cache = self._get_persistent_cache()
+        sp = None if cache is None else cache.get(jobid)
+        if sp is None:
+            try:
                 self._sp_cache_misses += 1
                 if not self._sp_cache_warned and\
                         self._sp_cache_misses > self._sp_cache_miss_warning_threshold:
@@ -739,14 +1040,14 @@ class Project(object):
                         "to update cache with the Project.update_cache() method.")
                     self._sp_cache_warned = True
                 sp = self._get_statepoint_from_workspace(jobid)
-        except KeyError as error:
-            try:
-                sp = self.read_statepoints(fn=fn)[jobid]
-            except IOError as io_error:
-                if io_error.errno != errno.ENOENT:
-                    raise io_error
-                else:
-                    raise error
+            except KeyError as error:
+                try:
+                    sp = self.read_statepoints(fn=fn)[jobid]
+                except IOError as io_error:
+                    if io_error.errno != errno.ENOENT:
+                        raise io_error
+                    else:
+                        raise error
         self._sp_cache[jobid] = sp
         return sp
 
@@ -1030,9 +1331,10 @@ class Project(object):
                     logger.warning(
                         "The job id of job '{}' is incorrect; "
                         "it should be '{}'.".format(job_id, correct_id))
-                    invalid_wd = os.path.join(self.workspace(), job_id)
-                    correct_wd = os.path.join(self.workspace(), correct_id)
+                    invalid_wd = self._get_job_workspace(job_id)
+                    correct_wd = self._get_job_workspace(correct_id)
                     try:
+                        _mkdir_p(os.path.dirname(correct_wd))
                         os.rename(invalid_wd, correct_wd)
                     except OSError as error:
                         logger.critical(
@@ -1065,39 +1367,208 @@ class Project(object):
         if corrupted:
             raise JobsCorruptedError(corrupted)
 
+    def shard_workspace(self, sharding):
+        """Convert the workspace in place to a layout with the given sharding.
+
+        With a sharding of N > 0, each job workspace directory is nested within
+        N levels of shard directories named after consecutive pairs of characters
+        of the job id, e.g., ``workspace/ab/cd/abcd...`` for N=2. This keeps the
+        number of entries per directory small for projects with a very large
+        number of jobs. A sharding of 0 restores the flat default layout.
+
+        The new sharding is stored in the project's configuration file after
+        all jobs were moved, so an interrupted conversion can be resumed by
+        calling this method again.
+
+        .. warning::
+
+            Job instances opened before the conversion refer to outdated
+            workspace paths and must be reopened. Linked views should be
+            updated with :meth:`create_linked_view`.
+
+        :param sharding: The number of shard directory levels.
+        :type sharding: int
+        :returns: The number of moved jobs.
+        :rtype: int
+        :raises ValueError: If the sharding is not within the supported range.
+        """
+        sharding = int(sharding)
+        if not 0 <= sharding <= 4:
+            raise ValueError("The workspace sharding must be between 0 and 4.")
+        wd, previous = self._wd, self._sharding
+        num_moved = 0
+        if sharding != previous:
+            shard_dirs = set()
+            for job_id in list(self._job_dirs()):
+                src = _job_workspace_path(wd, job_id, previous)
+                dst = _job_workspace_path(wd, job_id, sharding)
+                _mkdir_p(os.path.dirname(dst))
+                os.rename(src, dst)
+                num_moved += 1
+                shards = _job_shards(job_id, previous)
+                for depth in range(previous):
+                    shard_dirs.add(os.path.join(wd, *shards[:depth + 1]))
+            # Remove all shard directories of the previous layout that are now empty.
+            for shard_dir in sorted(shard_dirs, key=len, reverse=True):
+                try:
+                    os.rmdir(shard_dir)
+                except OSError as error:
+                    if error.errno not in (errno.ENOTEMPTY, errno.EEXIST):
+                        raise
+            logger.info("Moved {} jobs to workspace layout with sharding {}.".format(
+                num_moved, sharding))
+        for fn in CONFIG_FILENAMES:
+            fn_config = os.path.join(self._rd, fn)
+            if os.path.isfile(fn_config):
+                config = read_config_file(fn_config)
+                if 'project' in config:
+                    config['workspace_sharding'] = sharding
+                    config.write()
+                    break
+        else:
+            logger.warning(
+                "Unable to find the project configuration file, the workspace "
+                "sharding is only updated for this project instance.")
+        self._config['workspace_sharding'] = sharding
+        self._ws_snapshot_signature = None
+        self._job_cache.clear()
+        return num_moved
+
     def _sp_index(self):
-        job_ids = set(self._job_dirs())
-        to_add = job_ids.difference(self._index_cache)
-        to_remove = set(self._index_cache).difference(job_ids)
-        for _id in to_remove:
-            del self._index_cache[_id]
-        for _id in to_add:
-            self._index_cache[_id] = dict(statepoint=self.get_statepoint(_id), _id=_id)
+        job_ids = self._job_ids()
+        if job_ids is not self._index_cache_ids:
+            to_add = set(job_ids).difference(self._index_cache)
+            to_remove = set(self._index_cache).difference(job_ids)
+            for _id in to_remove:
+                del self._index_cache[_id]
+            for _id in to_add:
+                self._index_cache[_id] = dict(statepoint=self.get_statepoint(_id), _id=_id)
+            self._index_cache_ids = job_ids
         return self._index_cache.values()
 
+    def _read_job_documents(self, job_ids, num_workers=None, max_in_flight=None):
+        """Read the documents of the given jobs concurrently.
+
+        The documents are read by a pool of worker threads and yielded in
+        the order of job_ids. At most max_in_flight documents are read ahead
+        of the consumer, which limits the memory usage for large workspaces.
+
+        Parsed documents are cached together with the size, modification time,
+        and inode of the document file; only documents whose file signature
+        changed since the last read are read and parsed again. The document
+        cache is stored in the persistent cache if it exists. The yielded
+        documents are shared with the cache and must not be modified.
+
+        :param job_ids: The ids of the jobs to read the documents for.
+        :param num_workers: The number of worker threads, defaults to the
+            'document_index_num_workers' configuration value or 16.
+        :param max_in_flight: The maximum number of documents read ahead, defaults
+            to the 'document_index_max_in_flight' configuration value or
+            eight times the number of workers.
+        :yields: The job document for each job id as dict.
+        """
+        if num_workers is None:
+            num_workers = int(self._config.get('document_index_num_workers', 16))
+        if max_in_flight is None:
+            max_in_flight = int(self._config.get(
+                'document_index_max_in_flight', 8 * num_workers))
+        wd, sharding = self._wd, self._sharding
+        job_ids = list(job_ids)
+
+        doc_cache = self._doc_cache
+        persistent_cache = self._get_persistent_cache()
+        if persistent_cache is not None:
+            try:
+                doc_cache.update(persistent_cache.get_documents(
+                    [_id for _id in job_ids if _id not in doc_cache]))
+            except sqlite3.Error as error:
+                logger.warning("Unable to read job documents from the cache: {}".format(error))
+        updated = dict()
+
+        # The documents may exist in any format, the configured one is most likely.
+        fn_document = document_filename(self.Job.FN_DOCUMENT, self._document_codec)
+        fn_documents = [fn_document] + [
+            fn for fn in document_filenames(self.Job.FN_DOCUMENT) if fn != fn_document]
+
+        def _find(_id):
+            job_wd = _job_workspace_path(wd, _id, sharding)
+            found = []
+            for fn_doc in fn_documents:
+                fn = os.path.join(job_wd, fn_doc)
+                try:
+                    found.append((fn, _file_signature(fn)))
+                except OSError as error:
+                    if error.errno != errno.ENOENT:
+                        raise
+            if not found:
+                raise IOError(errno.ENOENT, "No document found for job '{}'.".format(_id))
+            _check_unambiguous([fn for fn, _ in found])
+            return found[0]
+
+        def _read(_id):
+            try:
+                fn, signature = _find(_id)
+                cached = doc_cache.get(_id)
+                if cached is not None and cached[0] is not None and cached[0] == signature:
+                    return cached[1]
+                with open(fn, 'rb') as file:
+                    doc = decode(file.read())
+            except (OSError, IOError) as error:
+                if error.errno != errno.ENOENT:
+                    raise
+                doc_cache.pop(_id, None)
+                return dict()
+            if _recently_modified(signature[1] * 1e-9):
+                signature = None
+            doc_cache[_id] = updated[_id] = (signature, doc)
+            return doc
+
+        if num_workers > 1 and len(job_ids) > 1:
+            pool = ThreadPool(min(num_workers, len(job_ids)))
+            try:
+                docs = _bounded_imap(pool, _read, job_ids, max_in_flight)
+                for doc in _print_throughput(
+                        docs, len(job_ids), write=logger.info, desc="Read job documents: "):
+                    yield doc
+            finally:
+                pool.terminate()
+        else:
+            for _id in job_ids:
+                yield _read(_id)
+
+        # Storing the documents in the persistent cache is optional, e.g., the
+        # cache may be locked by another process or the project read-only.
+        if updated and persistent_cache is not None:
+            try:
+                persistent_cache.update_documents(updated)
+            except sqlite3.Error as error:
+                logger.warning("Unable to store job documents in the cache: {}".format(error))
+
     def _build_index(self, include_job_document=False):
-        "Return a basic state point index."
-        wd = self.workspace() if self.Job == Job else None
-        for _id in self.find_job_ids():
+        """Return a basic state point index.
+
+        The job documents are shared with the document cache and must not be modified.
+        """
+        job_ids = self.find_job_ids()
+        if include_job_document:
+            if self.Job == Job:     # use optimized path
+                docs = self._read_job_documents(job_ids)
+            else:
+                docs = (self.open_job(id=_id).document for _id in job_ids)
+        for _id in job_ids:
             sp = self.get_statepoint(_id)
             doc = dict(_id=_id, statepoint=sp)
             if include_job_document:
-                if wd is None:
-                    doc.update(self.open_job(id=_id).document)
-                else:   # use optimized path
-                    try:
-                        with open(os.path.join(wd, _id, self.Job.FN_DOCUMENT), 'rb') as file:
-                            doc.update(json.loads(file.read().decode()))
-                    except IOError as error:
-                        if error.errno != errno.ENOENT:
-                            raise
+                doc.update(next(docs))
             yield doc
+        if include_job_document:
+            next(docs, None)    # Finish reading, e.g., to store the documents in the cache.
 
     def _update_in_memory_cache(self):
         "Update the in-memory state point cache to reflect the workspace."
         logger.debug("Updating in-memory cache...")
         start = time.time()
-        job_ids = set(self._job_dirs())
+        job_ids = set(self._job_ids())
         cached_ids = set(self._sp_cache)
         to_add = job_ids.difference(cached_ids)
         to_remove = cached_ids.difference(job_ids)
@@ -1105,22 +1576,30 @@ class Project(object):
             for _id in to_remove:
                 del self._sp_cache[_id]
 
+            # Look up as many state points as possible in the persistent cache.
+            cache = self._get_persistent_cache()
+            if cache is not None and to_add:
+                self._sp_cache.update(cache.get_many(to_add))
+                to_read = to_add.difference(self._sp_cache)
+            else:
+                to_read = to_add
+
             def _add(_id):
                 self._sp_cache[_id] = self._get_statepoint_from_workspace(_id)
 
-            to_add_chunks = split_and_print_progress(
-                iterable=list(to_add),
-                num_chunks=max(1, min(100, int(len(to_add) / 1000))),
+            to_read_chunks = split_and_print_progress(
+                iterable=list(to_read),
+                num_chunks=max(1, min(100, int(len(to_read) / 1000))),
                 write=logger.info,
                 desc="Read metadata: ")
 
             if six.PY2:
                 pool = ThreadPool()
-                for chunk in to_add_chunks:
+                for chunk in to_read_chunks:
                     pool.map(_add, chunk)
             else:
                 with ThreadPool() as pool:
-                    for chunk in to_add_chunks:
+                    for chunk in to_read_chunks:
                         pool.map(_add, chunk)
 
             delta = time.time() - start
@@ -1129,13 +1608,35 @@ class Project(object):
         else:
             logger.debug("In-memory cache is up to date.")
 
+    def _get_persistent_cache(self, create=False):
+        """Return the persistent state point cache.
+
+        A state point cache file in the legacy format is imported and replaced
+        upon first access.
+
+        :param create: Create the persistent cache if it does not exist yet.
+        :returns: The persistent cache or None if it does not exist.
+        """
+        if self._persistent_cache is None:
+            fn_legacy = self.fn(self.FN_CACHE_LEGACY)
+            cache = StatepointCache.open(
+                self.fn(self.FN_CACHE), create=create or os.path.isfile(fn_legacy))
+            if cache is not None and cache.import_legacy(fn_legacy) is not None:
+                os.remove(fn_legacy)
+            self._persistent_cache = cache
+        return self._persistent_cache
+
     def _remove_persistent_cache_file(self):
         "Remove the persistent cache file (if it exists)."
-        try:
-            os.remove(self.fn(self.FN_CACHE))
-        except (OSError, IOError) as error:
-            if error.errno != errno.ENOENT:
-                raise error
+        if self._persistent_cache is not None:
+            self._persistent_cache.close()
+            self._persistent_cache = None
+        for fn in (self.FN_CACHE, self.FN_CACHE_LEGACY):
+            try:
+                os.remove(self.fn(fn))
+            except (OSError, IOError) as error:
+                if error.errno != errno.ENOENT:
+                    raise error
 
     def update_cache(self):
         """Update the persistent state point cache (experimental).
@@ -1145,31 +1646,25 @@ class Project(object):
         including iteration and filtering or selection are expected
         to be significantly faster after calling this function, especially
         for large data spaces.
+
+        Only entries of jobs that were added to or removed from the
+        workspace since the last update are written to the cache.
         """
         warnings.warn(
             "The Project.update_cache() method is experimental and "
             "might be removed in future releases.", FutureWarning)
         logger.info('Update cache...')
         start = time.time()
-        cache = self._read_cache()
+        cache = self._get_persistent_cache(create=True)
+        signature = self._workspace_signature()
         self._update_in_memory_cache()
-        if cache is None or set(cache) != set(self._sp_cache):
-            fn_cache = self.fn(self.FN_CACHE)
-            fn_cache_tmp = fn_cache + '~'
-            try:
-                with gzip.open(fn_cache_tmp, 'wb') as cachefile:
-                    cachefile.write(json.dumps(self._sp_cache).encode())
-            except OSError:  # clean-up
-                try:
-                    os.remove(fn_cache_tmp)
-                except (OSError, IOError):
-                    pass
-                raise
-            else:
-                if six.PY2:
-                    os.rename(fn_cache_tmp, fn_cache)
-                else:
-                    os.replace(fn_cache_tmp, fn_cache)
+        cached_ids = set(cache.ids())
+        to_add = {_id: self._sp_cache[_id] for _id in set(self._sp_cache).difference(cached_ids)}
+        to_remove = cached_ids.difference(self._sp_cache)
+        cache.delete(to_remove)
+        cache.update(to_add)
+        cache.set_meta('workspace', signature)
+        if to_add or to_remove:
             delta = time.time() - start
             logger.info("Updated cache in {:.3f} seconds.".format(delta))
             return len(self._sp_cache)
@@ -1180,15 +1675,12 @@ class Project(object):
         "Read the persistent state point cache (if available)."
         logger.debug("Reading cache...")
         start = time.time()
-        try:
-            with gzip.open(self.fn(self.FN_CACHE), 'rb') as cachefile:
-                cache = json.loads(cachefile.read().decode())
-            self._sp_cache.update(cache)
-        except IOError as error:
-            if not error.errno == errno.ENOENT:
-                raise
+        cache = self._get_persistent_cache()
+        if cache is None:
             logger.debug("No cache file found.")
         else:
+            cache = cache.items()
+            self._sp_cache.update(cache)
             delta = time.time() - start
             logger.debug("Read cache in {:.3f} seconds.".format(delta))
             return cache
@@ -1223,6 +1715,8 @@ class Project(object):
             root = self.workspace()
 
             def _full_doc(doc):
+                if include_job_document:
+                    doc = _copy_document(doc)
                 doc['signac_id'] = doc['_id']
                 doc['root'] = root
                 return doc
@@ -1485,6 +1979,14 @@ def _make_link(src, dst):
         raise
 
 
+def _copy_document(doc):
+    "Return a copy of a JSON-like document, copying only nested dicts and lists."
+    if isinstance(doc, dict):
+        return {k: _copy_document(v) if isinstance(v, (dict, list)) else v
+                for k, v in doc.items()}
+    return [_copy_document(v) if isinstance(v, (dict, list)) else v for v in doc]
+
+
 def _skip_errors(iterable, log=print):
     while True:
         try:
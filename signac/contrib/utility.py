@@ -5,11 +5,13 @@ from __future__ import print_function
 import logging
 import sys
 import os
+import re
 import getpass
 import argparse
 import errno
 from time import time
 from datetime import timedelta
+from collections import deque
 
 from ..common import six
 
@@ -170,6 +172,68 @@ def _mkdir_p(path):
             raise
 
 
+# Number of job id characters used to name the shard directories of a sharded workspace.
+_SHARD_WIDTH = 2
+_SHARD_REGEX = re.compile('[a-f0-9]{{{}}}$'.format(_SHARD_WIDTH))
+
+
+def _job_shards(job_id, sharding):
+    "Return the names of the shard directories containing a job's workspace."
+    return [job_id[i * _SHARD_WIDTH:(i + 1) * _SHARD_WIDTH] for i in range(sharding)]
+
+
+def _job_workspace_path(root, job_id, sharding=0):
+    """Return the path of a job's workspace directory.
+
+    With a sharding of 0, the job workspace is located directly within root,
+    otherwise it is nested within `sharding` levels of shard directories,
+    e.g., ``root/ab/cd/abcd...`` for a sharding of 2.
+    """
+    return os.path.join(root, *(_job_shards(job_id, sharding) + [job_id]))
+
+
+def _iter_job_dirs(root, regex, sharding=0, _prefix=''):
+    """Yield the ids of all job workspace directories within root.
+
+    Errors on listing root are raised, shard directories that were removed
+    concurrently are skipped.
+    """
+    if sharding:
+        for shard in os.listdir(root):
+            if not _SHARD_REGEX.match(shard):
+                continue
+            try:
+                for job_id in _iter_job_dirs(
+                        os.path.join(root, shard), regex, sharding - 1, _prefix + shard):
+                    yield job_id
+            except OSError as error:
+                if error.errno not in (errno.ENOENT, errno.ENOTDIR):
+                    raise
+    else:
+        for d in os.listdir(root):
+            if regex.match(d) and d.startswith(_prefix):
+                yield d
+
+
+def _remove_tree(path):
+    "Remove the directory tree at path and return the number of freed bytes."
+    freed = 0
+    for root, dirs, files in os.walk(path, topdown=False):
+        for name in files:
+            fn = os.path.join(root, name)
+            freed += os.lstat(fn).st_size
+            os.remove(fn)
+        for name in dirs:
+            fn = os.path.join(root, name)
+            if os.path.islink(fn):
+                freed += os.lstat(fn).st_size
+                os.remove(fn)
+            else:
+                os.rmdir(fn)
+    os.rmdir(path)
+    return freed
+
+
 def is_string(s):
     if six.PY2:
         return isinstance(s, basestring)  # noqa
@@ -203,3 +267,41 @@ def split_and_print_progress(iterable, num_chunks=10, write=None, desc='Progress
         write("{}100%".format(desc))
     else:
         yield iterable
+
+
+def _bounded_imap(pool, func, iterable, max_in_flight):
+    """Lazily apply func to all items of iterable using the pool.
+
+    Like ``pool.imap()``, results are yielded in order, but the iterable is
+    consumed lazily and at most max_in_flight items are submitted to the
+    pool ahead of the consumer.
+    """
+    assert max_in_flight > 0
+    pending = deque()
+    for item in iterable:
+        pending.append(pool.apply_async(func, (item, )))
+        if len(pending) >= max_in_flight:
+            yield pending.popleft().get()
+    while pending:
+        yield pending.popleft().get()
+
+
+def _print_throughput(iterable, num_items, num_reports=10, write=None, desc='Progress: '):
+    """Yield all items of iterable and report progress and throughput.
+
+    The progress is reported num_reports times at evenly spaced intervals.
+    """
+    if write is None:
+        write = print
+    interval = max(1, int(num_items / num_reports))
+    start = time()
+    i = 0
+    for i, item in enumerate(iterable, 1):
+        yield item
+        if not i % interval and i < num_items:
+            delta = time() - start
+            write("{}{:3.0f}% ({:.0f}/s)".format(
+                desc, 100.0 * i / num_items, i / delta if delta else float('inf')))
+    if num_items > interval:
+        delta = time() - start
+        write("{}100% ({:.0f}/s)".format(desc, i / delta if delta else float('inf')))
@@ -0,0 +1,173 @@
+# Copyright (c) 2018 The Regents of the University of Michigan
+# All rights reserved.
+# This software is licensed under the BSD 3-Clause License.
+"Mapping of keys to numerical arrays stored as NumPy (.npy) files."
+import os
+import errno
+import uuid
+import logging
+
+from ..common import six
+
+if six.PY2:
+    from collections import MutableMapping
+else:
+    from collections.abc import MutableMapping
+
+try:
+    import numpy
+except ImportError:
+    NUMPY = False
+else:
+    NUMPY = True
+
+logger = logging.getLogger(__name__)
+
+
+class ArrayStore(MutableMapping):
+    """A mapping of keys to arrays, stored as NumPy (.npy) files in a directory.
+
+    Arrays are opened as read-only memory maps, which means that they are
+    not read into memory and that accessing only a part of an array only
+    reads the corresponding part of the file:
+
+    .. code-block:: python
+
+        store['positions'] = numpy.zeros((1000000, 3))
+        x = store['positions'][:, 0]    # only reads the first column
+
+    Arrays are written atomically when assigned. Parts of an existing array
+    are modified in place with :meth:`write` or with a writable memory
+    map returned by :meth:`open`.
+
+    This class requires the numpy package.
+
+    :param root: The directory in which the arrays are stored.
+    :type root: str
+    :param mmap_mode: The mode used to open arrays for reading, see
+        :func:`numpy.load`. None loads arrays into memory.
+    :type mmap_mode: str
+    """
+    SUFFIX = '.npy'
+
+    def __init__(self, root, mmap_mode='r'):
+        if not NUMPY:
+            raise ImportError("The array store requires the numpy package.")
+        self._root = root
+        self._mmap_mode = mmap_mode
+
+    def __repr__(self):
+        return "{}(root='{}')".format(type(self).__name__, self._root)
+
+    def _fn(self, key):
+        if not isinstance(key, six.string_types):
+            raise KeyError("Keys must be strings, not {}.".format(type(key)))
+        if not key or key.startswith('.') or os.sep in key or (os.altsep and os.altsep in key):
+            raise KeyError("Invalid key '{}'.".format(key))
+        return os.path.join(self._root, key + self.SUFFIX)
+
+    def _load(self, key, mmap_mode):
+        fn = self._fn(key)
+        try:
+            return numpy.load(fn, mmap_mode=mmap_mode, allow_pickle=False)
+        except (IOError, OSError) as error:
+            if error.errno == errno.ENOENT:
+                raise KeyError(key)
+            raise
+        except ValueError:
+            if mmap_mode is None:
+                raise
+            # Arrays without any elements can't be memory-mapped.
+            array = numpy.load(fn, allow_pickle=False)
+            if array.size:
+                raise
+            return array
+
+    def __getitem__(self, key):
+        return self._load(key, self._mmap_mode)
+
+    def open(self, key, mode='r+'):
+        """Open the array stored under key as memory map.
+
+        Modifications of a memory map opened in 'r+' mode are written
+        through to the file.
+
+        :param key: The key of the array.
+        :type key: str
+        :param mode: The memory map mode, see :func:`numpy.load`.
+        :type mode: str
+        :returns: The memory-mapped array.
+        :rtype: :class:`numpy.memmap`
+        :raises KeyError: If there is no array stored under key.
+        """
+        return self._load(key, mode)
+
+    def write(self, key, index, value):
+        """Write value to the part of an existing array selected by index.
+
+        Only the selected part of the array is written, for example:
+
+        .. code-block:: python
+
+            store.write('positions', slice(10, 20), 0)
+
+        :param key: The key of the array.
+        :type key: str
+        :param index: The index or slice to be modified.
+        :param value: The value to be assigned.
+        :raises KeyError: If there is no array stored under key.
+        """
+        array = self.open(key, mode='r+')
+        array[index] = value
+        if isinstance(array, numpy.memmap):
+            array.flush()
+
+    def __setitem__(self, key, value):
+        fn = self._fn(key)
+        try:
+            os.makedirs(self._root)
+        except OSError as error:
+            if error.errno != errno.EEXIST:
+                raise
+        fn_tmp = os.path.join(self._root, '._{uid}_{fn}'.format(
+            uid=uuid.uuid4(), fn=os.path.basename(fn)))
+        try:
+            with open(fn_tmp, 'wb') as file:
+                numpy.save(file, numpy.asanyarray(value), allow_pickle=False)
+            if six.PY2:
+                os.rename(fn_tmp, fn)
+            else:
+                os.replace(fn_tmp, fn)
+        except BaseException:
+            if os.path.isfile(fn_tmp):
+                os.remove(fn_tmp)
+            raise
+
+    def __delitem__(self, key):
+        try:
+            os.remove(self._fn(key))
+        except OSError as error:
+            if error.errno == errno.ENOENT:
+                raise KeyError(key)
+            raise
+
+    def __contains__(self, key):
+        try:
+            return os.path.isfile(self._fn(key))
+        except KeyError:
+            return False
+
+    def __iter__(self):
+        "Iterate over the keys of all stored arrays without reading them."
+        try:
+            fns = os.listdir(self._root)
+        except OSError as error:
+            if error.errno != errno.ENOENT:
+                raise
+            return
+        for fn in fns:
+            if fn.endswith(self.SUFFIX) and not fn.startswith('.'):
+                yield fn[:-len(self.SUFFIX)]
+
+    def __len__(self):
+        return len(list(iter(self)))
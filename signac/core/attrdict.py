@@ -15,7 +15,7 @@ class SyncedAttrDict(_SyncedDict):
         ad = SyncedAttrDict(nested_dict)
         assert ad.a.b == 0
     """
-    _PROTECTED_KEYS = ('_data', '_suspend_sync_', '_load', '_save')
+    _PROTECTED_KEYS = ('_data', '_suspend_sync_', '_save_pending', '_load', '_save')
 
     def __getattr__(self, name):
         try:
@@ -0,0 +1,173 @@
+# Copyright (c) 2018 The Regents of the University of Michigan
+# All rights reserved.
+# This software is licensed under the BSD 3-Clause License.
+"""Codecs for the serialization of job and project documents.
+
+Documents are encoded with the codec configured for a project, JSON by
+default. Binary documents are stored with the suffix of their codec instead
+of '.json', e.g., 'signac_job_document.msgpack', so that they are not
+mistaken for JSON files; older versions of signac do not read them.
+Existing documents are used in the format in which they were created,
+regardless of the configured codec; a document that exists in more than
+one format is refused.
+"""
+from __future__ import absolute_import
+import os
+import logging
+
+from .json import json
+
+logger = logging.getLogger(__name__)
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+    logger.debug("Failed to import msgpack. The 'msgpack' codec will not be available.")
+
+try:
+    import cbor2
+except ImportError:
+    cbor2 = None
+    logger.debug("Failed to import cbor2. The 'cbor' codec will not be available.")
+
+
+class JSONCodec(object):
+    "Encode documents as JSON text."
+    name = 'json'
+    suffix = '.json'
+
+    def encode(self, data):
+        return json.dumps(data).encode()
+
+    def decode(self, blob, encoding='utf-8'):
+        return json.loads(blob.decode(encoding))
+
+
+class MsgpackCodec(object):
+    "Encode documents in the binary MessagePack format (requires msgpack)."
+    name = 'msgpack'
+    suffix = '.msgpack'
+
+    def encode(self, data):
+        return msgpack.packb(data, use_bin_type=True)
+
+    def decode(self, blob, encoding=None):
+        return msgpack.unpackb(blob, raw=False)
+
+
+class CBORCodec(object):
+    "Encode documents in the binary CBOR format (requires cbor2)."
+    name = 'cbor'
+    suffix = '.cbor'
+
+    def encode(self, data):
+        return cbor2.dumps(data)
+
+    def decode(self, blob, encoding=None):
+        return cbor2.loads(blob)
+
+
+DEFAULT_CODEC = JSONCodec()
+
+# Maps the codec names to the codec class and the required package (if any).
+_CODECS = {
+    'json': (JSONCodec, None),
+    'msgpack': (MsgpackCodec, None if msgpack is not None else 'msgpack'),
+    'cbor': (CBORCodec, None if cbor2 is not None else 'cbor2'),
+}
+
+_CODEC_NAMES = ('json', 'msgpack', 'cbor')
+
+
+def get_codec(name=None):
+    """Return the document codec with the given name.
+
+    :param name: One of 'json' (default), 'msgpack', or 'cbor'.
+    :type name: str
+    :raises ValueError: If the codec is unknown.
+    :raises ImportError: If the package required for the codec is not installed.
+    """
+    if name is None or name == DEFAULT_CODEC.name:
+        return DEFAULT_CODEC
+    try:
+        codec, missing = _CODECS[name]
+    except KeyError:
+        raise ValueError("Unknown document codec '{}', choose from: {}.".format(
+            name, ', '.join(sorted(_CODECS))))
+    if missing is not None:
+        raise ImportError(
+            "The '{}' document codec requires the '{}' package.".format(name, missing))
+    return codec()
+
+
+def document_filename(filename, codec):
+    "Return the filename of a document encoded with codec, e.g., 'doc.msgpack' for 'doc.json'."
+    return os.path.splitext(filename)[0] + codec.suffix
+
+
+def document_filenames(filename):
+    "Return the filenames of a document for all codecs, starting with JSON."
+    return [document_filename(filename, _CODECS[name][0]) for name in _CODEC_NAMES]
+
+
+def find_documents(filename):
+    "Return the filenames of all existing files of a document, in any format."
+    return [fn for fn in document_filenames(filename) if os.path.exists(fn)]
+
+
+def _check_unambiguous(filenames):
+    "Raise an error if a document exists in more than one format."
+    if len(filenames) > 1:
+        raise RuntimeError(
+            "The document exists in multiple formats: {}. Remove all but one "
+            "of the files.".format(', '.join(map(repr, filenames))))
+
+
+def find_document(filename, codec):
+    """Return the filename and the codec of a document.
+
+    The filename of the document encoded with codec is returned, unless
+    only a document encoded with another codec exists. This means that
+    existing documents keep their format when the codec is changed.
+
+    :param filename: The filename of the JSON-encoded document.
+    :type filename: str
+    :param codec: The codec for new documents.
+    :returns: The filename and the codec of the document.
+    :raises ImportError: If the package required to decode an existing
+        document is not installed.
+    :raises RuntimeError: If the document exists in more than one format.
+    """
+    existing = find_documents(filename)
+    _check_unambiguous(existing)
+    for name in _CODEC_NAMES:
+        fn = document_filename(filename, _CODECS[name][0])
+        if fn in existing:
+            return fn, codec if name == codec.name else get_codec(name)
+    return document_filename(filename, codec), codec
+
+
+def _detect_codec(blob):
+    "Determine the codec of an encoded document from its first byte."
+    # Only a short prefix is stripped to avoid copying the whole blob.
+    first = bytearray(blob[:64].lstrip()[:1])
+    if not first or first[0] == ord('{'):
+        return DEFAULT_CODEC
+    elif 0x80 <= first[0] <= 0x8f or first[0] in (0xde, 0xdf):   # msgpack map
+        return get_codec('msgpack')
+    elif 0xa0 <= first[0] <= 0xbf or first[0] == 0xd9:   # CBOR map or tag
+        return get_codec('cbor')
+    return DEFAULT_CODEC
+
+
+def decode(blob, encoding='utf-8'):
+    """Decode a document that was encoded with any of the document codecs.
+
+    :param blob: The encoded document.
+    :type blob: bytes
+    :param encoding: The text encoding of JSON documents.
+    :type encoding: str
+    :returns: The decoded document.
+    """
+    return _detect_codec(blob).decode(blob, encoding)
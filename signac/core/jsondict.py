@@ -6,13 +6,19 @@ import os
 import sys
 import errno
 import uuid
+import time
 import hashlib
 import logging
+import threading
 from tempfile import mkstemp
 from contextlib import contextmanager
+from collections import namedtuple
+from collections import OrderedDict
+from multiprocessing.pool import ThreadPool
 
 from .errors import Error
-from .json import json
+from .codec import DEFAULT_CODEC
+from .codec import decode
 from .attrdict import SyncedAttrDict
 from ..common import six
 
@@ -20,13 +26,11 @@ from ..common import six
 logger = logging.getLogger(__name__)
 
 DEFAULT_BUFFER_SIZE = 32 * 2**20    # 32 MB
+DEFAULT_FLUSH_NUM_WORKERS = 8
 
-_BUFFERED_MODE = 0
-_BUFFERED_MODE_FORCE_WRITE = None
-_BUFFER_SIZE = None
-_JSONDICT_BUFFER = dict()
-_JSONDICT_HASHES = dict()
-_JSONDICT_META = dict()
+# The buffered mode state is stored per thread, see _get_buffer().
+_THREAD_LOCAL = threading.local()
+_STRICT_MODE = False
 
 
 class BufferException(Error):
@@ -66,76 +70,358 @@ def _get_filemetadata(filename):
             raise
 
 
+class FlushResult(namedtuple('FlushResult', ['written', 'error'])):
+    """The result of flushing one buffered file.
+
+    .. attribute:: written
+
+        True if the file was written, False if the file was unchanged or
+        could not be written.
+
+    .. attribute:: error
+
+        The reason why the file could not be written or None.
+    """
+    __slots__ = ()
+
+
+class TransactionConflictError(Error):
+    """Raised when a file was externally modified during a transaction.
+
+    .. attribute:: filename
+
+        The filename of the file that was modified.
+    """
+    def __init__(self, filename):
+        self.filename = filename
+
+    def __str__(self):
+        return "{}({})".format(type(self).__name__, self.filename)
+
+
+def _file_signature(filename):
+    "Return the size, modification time in nanoseconds, and inode of a file."
+    st = os.stat(filename)
+    mtime_ns = getattr(st, 'st_mtime_ns', None)
+    if mtime_ns is None:
+        mtime_ns = int(st.st_mtime * 1e9)
+    return [st.st_size, mtime_ns, st.st_ino]
+
+
+def _recently_modified(mtime):
+    """Return True if a file was modified less than a second ago.
+
+    The signature of recently modified files is not trusted, since the
+    modification time may not reflect all changes in that case.
+
+    :param mtime: The modification time in seconds.
+    """
+    return time.time() - mtime < 1.0
+
+
+_BUFFER_STATS_COUNTERS = (
+    'read_hits', 'read_misses', 'writes_deferred', 'bytes_deferred',
+    'files_written', 'bytes_written', 'files_unchanged', 'files_failed',
+    'files_evicted', 'flush_count', 'flush_time', 'last_flush_time')
+
+
+class _Buffer(object):
+    """The state of the buffered read/write mode of one thread.
+
+    Each thread has its own buffer with its own size and write policy,
+    so that multiple threads may use the buffered mode independently.
+
+    The buffered blobs are ordered from least to most recently used and
+    the total size of all blobs is tracked in the load attribute.
+    """
+
+    def __init__(self):
+        self.depth = 0
+        self.size = None
+        self.force_write = None
+        self.num_workers = None
+        self.fsync = None
+        self.blobs = OrderedDict()
+        self.load = 0
+        self.hashes = dict()
+        self.meta = dict()
+        self.stats = dict.fromkeys(_BUFFER_STATS_COUNTERS, 0)
+
+
+def _get_buffer():
+    "Return the buffer of the current thread."
+    try:
+        return _THREAD_LOCAL.buffer
+    except AttributeError:
+        _THREAD_LOCAL.buffer = _Buffer()
+        return _THREAD_LOCAL.buffer
+
+
+def _pop_from_buffer(buf, filename=None):
+    """Remove a blob from the buffer and return the corresponding entry.
+
+    Removes the least recently used blob if filename is None.
+    """
+    if filename is None:
+        filename, blob = buf.blobs.popitem(last=False)
+    else:
+        blob = buf.blobs.pop(filename)
+    buf.load -= sys.getsizeof(blob)
+    return filename, blob, buf.hashes.pop(filename, None), buf.meta.pop(filename, None)
+
+
+def _touch_buffer(buf, filename):
+    "Mark the blob of filename as most recently used."
+    buf.blobs[filename] = buf.blobs.pop(filename)
+
+
+def _evict_from_buffer(buf, required):
+    """Evict the least recently used blobs until required bytes are available.
+
+    Modified blobs are written back, unmodified blobs are simply discarded.
+    """
+    entries = []
+    while buf.blobs and buf.load + required > buf.size:
+        entries.append(_pop_from_buffer(buf))
+    logger.debug("Buffer overflow, evicting {} file(s)...".format(len(entries)))
+    buf.stats['files_evicted'] += len(entries)
+    _write_back(buf, entries, buf.num_workers or DEFAULT_FLUSH_NUM_WORKERS,
+                bool(buf.fsync), raise_on_error=True)
+
+
 def _store_in_buffer(filename, blob, store_hash=False):
-    assert _BUFFERED_MODE > 0
+    buf = _get_buffer()
+    assert buf.depth > 0
     blob_size = sys.getsizeof(blob)
-    buffer_load = get_buffer_load()
-    if _BUFFER_SIZE > 0:
-        if blob_size > _BUFFER_SIZE:
+    if filename in buf.blobs:
+        old_blob = buf.blobs.pop(filename)
+        buf.load -= sys.getsizeof(old_blob)
+    else:
+        old_blob = None
+    if buf.size > 0:
+        if blob_size > buf.size:
+            if old_blob is not None:
+                # Discard any previous modifications, which are superseded.
+                buf.hashes.pop(filename, None)
+                buf.meta.pop(filename, None)
             return False
-        elif blob_size + buffer_load > _BUFFER_SIZE:
-            logger.debug("Buffer overflow, flushing...")
-            flush_all()
+        elif blob_size + buf.load > buf.size:
+            _evict_from_buffer(buf, blob_size)
 
-    _JSONDICT_BUFFER[filename] = blob
+    buf.blobs[filename] = blob
+    buf.load += blob_size
     if store_hash:
-        if not _BUFFERED_MODE_FORCE_WRITE:
-            _JSONDICT_META[filename] = _get_filemetadata(filename)
-        _JSONDICT_HASHES[filename] = _hash(blob)
+        if not buf.force_write:
+            buf.meta[filename] = _get_filemetadata(filename)
+        buf.hashes[filename] = _hash(blob)
+    elif filename not in buf.hashes:
+        # The original file content is unknown, the blob must be written back.
+        if not buf.force_write:
+            buf.meta[filename] = _get_filemetadata(filename)
+        buf.hashes[filename] = None
+    if not store_hash:
+        buf.stats['writes_deferred'] += 1
+        buf.stats['bytes_deferred'] += len(blob)
     return True
 
 
-def flush_all():
-    "Execute all deferred JSONDict write operations."
+def _write_file(filename, blob, fsync=False):
+    "Atomically replace the content of filename with blob."
+    # The temporary file has the suffix of the target file, e.g., of a binary document.
+    fd_tmp, fn_tmp = mkstemp(dir=os.path.dirname(filename), suffix=os.path.splitext(filename)[1])
+    try:
+        with os.fdopen(fd_tmp, 'wb') as file:
+            file.write(blob)
+            if fsync:
+                file.flush()
+                os.fsync(file.fileno())
+    except OSError:
+        os.remove(fn_tmp)
+        raise
+    if six.PY2:
+        os.rename(fn_tmp, filename)
+    else:
+        os.replace(fn_tmp, filename)
+
+
+def _fsync_dir(dirname):
+    try:
+        fd = os.open(dirname, os.O_RDONLY)
+    except OSError as error:    # Directories can't be opened on all platforms.
+        logger.debug("Unable to fsync directory '{}': {}".format(dirname, error))
+        return
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def _flush_group(args):
+    "Flush all buffered files of one directory."
+    dirname, entries, force_write, fsync = args
+    results = dict()
+    for filename, blob, blob_hash, meta in entries:
+        if _hash(blob) == blob_hash:
+            results[filename] = FlushResult(False, None)
+            continue
+        try:
+            if not force_write and _get_filemetadata(filename) != meta:
+                results[filename] = FlushResult(
+                    False, 'File appears to have been externally modified.')
+                continue
+            _write_file(filename, blob, fsync)
+        except OSError as error:
+            logger.error(str(error))
+            results[filename] = FlushResult(False, error)
+        else:
+            results[filename] = FlushResult(True, None)
+    if fsync and any(result.written for result in results.values()):
+        _fsync_dir(dirname)
+    return results
+
+
+def flush_all(num_workers=None, fsync=None, raise_on_error=True):
+    """Execute all deferred JSONDict write operations of the current thread.
+
+    The buffered files are grouped by their parent directory and the groups
+    are written concurrently by a pool of worker threads.
+
+    :param num_workers:
+        The number of threads used to write the buffered files. Defaults
+        to the value specified when entering the buffered mode.
+    :type num_workers:
+        int
+    :param fsync:
+        Synchronize all written files to disk and synchronize each directory
+        once after all of its files were replaced. Defaults to the value
+        specified when entering the buffered mode.
+    :type fsync:
+        bool
+    :param raise_on_error:
+        Raise a BufferedFileError if any of the buffered files could not be
+        written. Otherwise the issues are only reported in the returned results.
+    :type raise_on_error:
+        bool
+    :returns:
+        A dictionary that maps the filename of each flushed file to a
+        FlushResult.
+    :raises BufferedFileError:
+        If raise_on_error is True and one or more files could not be written.
+    """
     logger.debug("Flushing buffer...")
-    issues = dict()
-    while _JSONDICT_BUFFER:
-        filename, blob = _JSONDICT_BUFFER.popitem()
-        if not _BUFFERED_MODE_FORCE_WRITE:
-            meta = _JSONDICT_META.pop(filename)
-        if _hash(blob) != _JSONDICT_HASHES.pop(filename):
-            try:
-                if not _BUFFERED_MODE_FORCE_WRITE:
-                    if _get_filemetadata(filename) != meta:
-                        issues[filename] = 'File appears to have been externally modified.'
-                        continue
-                try:
-                    fd_tmp, fn_tmp = mkstemp(dir=os.path.dirname(filename), suffix='.json')
-                    with os.fdopen(fd_tmp, 'wb') as file:
-                        file.write(blob)
-                except OSError as error:
-                    os.remove(fn_tmp)
-                    raise
-                else:
-                    if six.PY2:
-                        os.rename(fn_tmp, filename)
-                    else:
-                        os.replace(fn_tmp, filename)
-            except OSError as error:
-                logger.error(str(error))
-                issues[filename] = error
-    if issues:
-        raise BufferedFileError(issues)
+    buf = _get_buffer()
+    if num_workers is None:
+        num_workers = buf.num_workers or DEFAULT_FLUSH_NUM_WORKERS
+    if fsync is None:
+        fsync = bool(buf.fsync)
+
+    entries = []
+    while buf.blobs:
+        entries.append(_pop_from_buffer(buf))
+    start = time.time()
+    try:
+        return _write_back(buf, entries, num_workers, fsync, raise_on_error)
+    finally:
+        delta = time.time() - start
+        buf.stats['flush_count'] += 1
+        buf.stats['flush_time'] += delta
+        buf.stats['last_flush_time'] = delta
+        if entries:
+            logger.debug("Flushed {} buffered file(s) in {:.3f}s.".format(len(entries), delta))
+
+
+def _write_back(buf, entries, num_workers, fsync, raise_on_error):
+    "Write all modified blobs of the given buffer entries to disk."
+    groups = dict()
+    for entry in entries:
+        groups.setdefault(os.path.dirname(entry[0]), []).append(entry)
+    tasks = [(dirname, group, buf.force_write, fsync) for dirname, group in groups.items()]
+
+    results = dict()
+    if num_workers > 1 and len(tasks) > 1:
+        pool = ThreadPool(min(num_workers, len(tasks)))
+        try:
+            for group_results in pool.imap_unordered(_flush_group, tasks):
+                results.update(group_results)
+        finally:
+            pool.terminate()
+    else:
+        for task in tasks:
+            results.update(_flush_group(task))
+
+    for filename, blob, _, _ in entries:
+        result = results[filename]
+        if result.written:
+            buf.stats['files_written'] += 1
+            buf.stats['bytes_written'] += len(blob)
+        elif result.error is None:
+            buf.stats['files_unchanged'] += 1
+        else:
+            buf.stats['files_failed'] += 1
+
+    if raise_on_error:
+        issues = {fn: result.error for fn, result in results.items() if result.error is not None}
+        if issues:
+            raise BufferedFileError(issues)
+    return results
 
 
 def get_buffer_size():
-    "Returns the current maximum size of the read/write buffer."
-    return _BUFFER_SIZE
+    "Returns the current maximum size of the read/write buffer of the current thread."
+    return _get_buffer().size
 
 
 def get_buffer_load():
-    "Returns the current actual size of the read/write buffer."
-    return sum((sys.getsizeof(x) for x in _JSONDICT_BUFFER.values()))
+    "Returns the current actual size of the read/write buffer of the current thread."
+    return _get_buffer().load
+
+
+def buffer_stats(reset=False):
+    """Return statistics about the buffered mode of the current thread.
+
+    The returned dictionary contains the following cumulative counters:
+
+        * read_hits / read_misses: reads served from the buffer or from disk
+        * writes_deferred / bytes_deferred: writes stored in the buffer
+        * files_written / bytes_written: files actually written to disk
+        * files_unchanged: buffered files, that were not modified
+        * files_failed: files that could not be written
+        * files_evicted: files evicted because the buffer was full
+        * flush_count / flush_time / last_flush_time: number and duration
+          in seconds of all flush operations
+
+    and the current state of the buffer:
+
+        * entries / dirty / clean: number of (modified / unmodified) buffered files
+        * load / size: current and maximum size of the buffer
+
+    :param reset:
+        Reset all counters after retrieving them.
+    :type reset:
+        bool
+    :returns:
+        A dictionary of buffer statistics.
+    """
+    buf = _get_buffer()
+    stats = dict(buf.stats)
+    dirty = sum(1 for fn, blob in buf.blobs.items() if _hash(blob) != buf.hashes.get(fn))
+    stats.update(
+        entries=len(buf.blobs), dirty=dirty, clean=len(buf.blobs) - dirty,
+        load=buf.load, size=buf.size)
+    if reset:
+        buf.stats = dict.fromkeys(_BUFFER_STATS_COUNTERS, 0)
+    return stats
 
 
 def in_buffered_mode():
-    "Return true if in buffered read/write mode."
-    return _BUFFERED_MODE > 0
+    "Return true if the current thread is in buffered read/write mode."
+    return _get_buffer().depth > 0
 
 
 @contextmanager
-def buffer_reads_writes(buffer_size=DEFAULT_BUFFER_SIZE, force_write=False):
-    """Enter a global buffer mode for all JSONDict instances.
+def buffer_reads_writes(buffer_size=DEFAULT_BUFFER_SIZE, force_write=False,
+                        num_workers=None, fsync=False):
+    """Enter a buffer mode for all JSONDict instances used by the current thread.
 
     All future write operations are written to the buffer, read
     operations are performed from the buffer whenever possible.
@@ -147,17 +433,31 @@ def buffer_reads_writes(buffer_size=DEFAULT_BUFFER_SIZE, force_write=False):
     can only be set *once*. Any subsequent specifications of the buffer
     size are ignored.
 
+    Each thread has its own buffer, that means that the buffered mode
+    only applies to the thread that entered it and that multiple threads
+    may buffer their reads and writes independently with different
+    buffer sizes and write policies.
+
     :param buffer_size:
         Specify the maximum size of the read/write buffer. Defaults
         to DEFAULT_BUFFER_SIZE. A negative number indicates to not
         restrict the buffer size.
     :type buffer_size:
         int
+    :param num_workers:
+        The number of threads used to write the buffered files when the
+        buffer is flushed. Defaults to DEFAULT_FLUSH_NUM_WORKERS.
+    :type num_workers:
+        int
+    :param fsync:
+        Synchronize the flushed files and their directories to disk.
+    :type fsync:
+        bool
+
+    The flush options are determined by the outermost buffered context.
     """
-    global _BUFFERED_MODE
-    global _BUFFERED_MODE_FORCE_WRITE
-    global _BUFFER_SIZE
-    assert _BUFFERED_MODE >= 0
+    buf = _get_buffer()
+    assert buf.depth >= 0
 
     # Basic type check (to prevent common user error)
     if not isinstance(buffer_size, six.integer_types) or \
@@ -165,43 +465,80 @@ def buffer_reads_writes(buffer_size=DEFAULT_BUFFER_SIZE, force_write=False):
         raise TypeError("The buffer size must be an integer!")
 
     # Can't enter force write mode, if already in non-force write mode:
-    if _BUFFERED_MODE_FORCE_WRITE is not None and (force_write and not _BUFFERED_MODE_FORCE_WRITE):
+    if buf.force_write is not None and (force_write and not buf.force_write):
         raise BufferException(
             "Unable to enter buffered mode with force write enabled, because "
             "we are already in buffered mode with force write disabled.")
 
     # Check whether we can adjust the buffer size and warn otherwise:
-    if _BUFFER_SIZE is not None and _BUFFER_SIZE != buffer_size:
+    if buf.size is not None and buf.size != buffer_size:
         raise BufferException("Buffer size already set, unable to change its size!")
 
-    _BUFFER_SIZE = buffer_size
-    _BUFFERED_MODE_FORCE_WRITE = force_write
+    buf.size = buffer_size
+    buf.force_write = force_write
+    if buf.depth == 0:
+        buf.num_workers = num_workers
+        buf.fsync = fsync
 
-    _BUFFERED_MODE += 1
+    buf.depth += 1
     try:
         yield
     finally:
-        _BUFFERED_MODE -= 1
-        if _BUFFERED_MODE == 0:
+        buf.depth -= 1
+        if buf.depth == 0:
             try:
                 flush_all()
             finally:
-                assert not _JSONDICT_BUFFER
-                assert not _JSONDICT_HASHES
-                assert not _JSONDICT_META
-                _BUFFER_SIZE = None
-                _BUFFERED_MODE_FORCE_WRITE = None
+                assert not buf.blobs
+                assert not buf.hashes
+                assert not buf.meta
+                assert buf.load == 0
+                buf.size = None
+                buf.force_write = None
+                buf.num_workers = None
+                buf.fsync = None
+
+
+def set_strict_mode(strict=True):
+    """Enable or disable the strict read mode for all JSONDict instances.
+
+    By default, a JSONDict only parses its file again when the file's size,
+    modification time, or inode changed since it was last read. In strict
+    mode, the file is read and parsed on every access.
+
+    Enable the strict mode when files may be modified in place without
+    a change in size within the resolution of the file system's
+    modification times, or to discard in-place modifications of
+    mutable values, such as lists, that were not explicitly saved.
+
+    :param strict: Whether to enable (True) or disable (False) the strict mode.
+    :type strict: bool
+    """
+    global _STRICT_MODE
+    _STRICT_MODE = bool(strict)
+
+
+def in_strict_mode():
+    "Return true if in strict read mode."
+    return _STRICT_MODE
 
 
 class JSONDict(SyncedAttrDict):
+    _PROTECTED_KEYS = SyncedAttrDict._PROTECTED_KEYS + (
+        '_signature', '_blob_hash', '_transaction', '_transaction_modified', '_codec')
 
-    def __init__(self, parent=None, filename=None, write_concern=False):
+    def __init__(self, parent=None, filename=None, write_concern=False, codec=None):
         if (filename is None) == (parent is None):
             raise ValueError(
                 "Illegal argument combination, one of the two arguments, "
                 "parent or filename must be None, but not both.")
         self._filename = None if filename is None else os.path.realpath(filename)
         self._write_concern = write_concern
+        self._codec = DEFAULT_CODEC if codec is None else codec
+        self._signature = None
+        self._blob_hash = None
+        self._transaction = 0
+        self._transaction_modified = False
         super(JSONDict, self).__init__(parent=parent)
 
     def _load_from_disk(self):
@@ -212,52 +549,160 @@ class JSONDict(SyncedAttrDict):
             if error.errno == errno.ENOENT:
                 return None
 
+    def _load_buffered(self):
+        buf = _get_buffer()
+        if self._filename in buf.blobs:
+            # Load from buffer:
+            buf.stats['read_hits'] += 1
+            _touch_buffer(buf, self._filename)
+            return buf.blobs[self._filename]
+        else:
+            # Load from disk and store in buffer
+            buf.stats['read_misses'] += 1
+            blob = self._load_from_disk()
+            _store_in_buffer(self._filename, blob, store_hash=True)
+            return blob
+
+    def _load_current(self):
+        "Return the current file content, including buffered modifications."
+        if in_buffered_mode():
+            return self._load_buffered()
+        return self._load_from_disk()
+
     def _load(self):
         assert self._filename is not None
 
-        if _BUFFERED_MODE > 0:
-            if self._filename in _JSONDICT_BUFFER:
-                # Load from buffer:
-                blob = _JSONDICT_BUFFER[self._filename]
-            else:
-                # Load from disk and store in buffer
-                blob = self._load_from_disk()
-                _store_in_buffer(self._filename, blob, store_hash=True)
+        if self._transaction:
+            return None     # The data is only loaded once per transaction.
+        elif in_buffered_mode():
+            blob = self._load_buffered()
         else:
+            try:
+                signature = _file_signature(self._filename)
+            except OSError as error:
+                if error.errno != errno.ENOENT:
+                    raise
+                signature = None
+            if signature is not None and not _STRICT_MODE and signature == self._signature:
+                return None     # The file is unchanged; keep the current data.
             # Just load from disk
             blob = self._load_from_disk()
+            if signature is not None and _recently_modified(signature[1] * 1e-9):
+                signature = None
+            self._signature = signature
 
-        return dict() if blob is None else json.loads(blob.decode())
+        blob_hash = _hash(blob)
+        if blob_hash == self._blob_hash and not _STRICT_MODE:
+            return None     # The content is unchanged; keep the current data.
+        self._blob_hash = blob_hash
+        return dict() if blob is None else decode(blob)
 
-    def _save(self, data=None):
+    def _save(self, data=None, _atomic=False):
         assert self._filename is not None
 
+        if self._transaction:
+            # All modifications are written at the end of the transaction.
+            if data is not None:
+                # Explicitly provided data, e.g., of a buffered dict, replaces
+                # the data of the transaction.
+                with self._suspend_sync():
+                    self._dfs_update(self._data, data)
+            self._transaction_modified = True
+            return
+
+        # The file content must be read again after any attempt to modify it.
+        self._signature = self._blob_hash = None
+
         if data is None:
             data = self._as_dict()
+            own_data = True
+        else:
+            own_data = False
 
         # Serialize data:
-        blob = json.dumps(data).encode()
-
-        if _BUFFERED_MODE > 0:
-            _store_in_buffer(self._filename, blob)
-        else:   # Saving to disk:
-            if self._write_concern:
-                dirname, filename = os.path.split(self._filename)
-                fn_tmp = os.path.join(dirname, '._{uid}_{fn}'.format(
-                    uid=uuid.uuid4(), fn=filename))
-                with open(fn_tmp, 'wb') as tmpfile:
-                    tmpfile.write(blob)
-                if six.PY2:
-                    os.rename(fn_tmp, self._filename)
-                else:
-                    os.replace(fn_tmp, self._filename)
+        blob = self._codec.encode(data)
+
+        if not (in_buffered_mode() and _store_in_buffer(self._filename, blob)):
+            # Saving to disk (also if the blob exceeds the buffer size):
+            self._write_to_disk(blob, _atomic)
+        if own_data:
+            # The current data matches the file content.
+            self._blob_hash = _hash(blob)
+
+    def _write_to_disk(self, blob, _atomic=False):
+        if self._write_concern or _atomic:
+            dirname, filename = os.path.split(self._filename)
+            fn_tmp = os.path.join(dirname, '._{uid}_{fn}'.format(
+                uid=uuid.uuid4(), fn=filename))
+            with open(fn_tmp, 'wb') as tmpfile:
+                tmpfile.write(blob)
+            if six.PY2:
+                os.rename(fn_tmp, self._filename)
             else:
-                with open(self._filename, 'wb') as file:
-                    file.write(blob)
+                os.replace(fn_tmp, self._filename)
+        else:
+            with open(self._filename, 'wb') as file:
+                file.write(blob)
 
     def __repr__(self):
         return repr(self())
 
+    @contextmanager
+    def transaction(self):
+        """Apply multiple modifications with a single write operation.
+
+        The data is loaded once upon entering the context and all
+        modifications within the context are only applied in memory.
+        Upon exit, the data is written once, using a temporary file
+        that atomically replaces the original file. All modifications
+        are discarded if an exception occurs within the context.
+
+        .. code-block:: python
+
+            with job.document.transaction():
+                job.doc.a = 0
+                job.doc.b = {'c': 1}
+
+        Transactions may be nested, only the outermost transaction
+        writes the data.
+
+        :raises TransactionConflictError:
+            If the file was modified by another process or instance during
+            the transaction. The modifications of the transaction are
+            discarded in that case.
+        """
+        root = self
+        while root._parent is not None:
+            root = root._parent
+        if root._transaction:
+            root._transaction += 1
+            try:
+                yield self
+            finally:
+                root._transaction -= 1
+            return
+
+        blob = root._load_current()
+        with root._suspend_sync():
+            root._dfs_update(root._data, dict() if blob is None else decode(blob))
+        root._blob_hash = _hash(blob)
+        root._transaction = 1
+        root._transaction_modified = False
+        try:
+            yield self
+        except BaseException:
+            root._transaction = 0
+            root._signature = root._blob_hash = None
+            root.load()     # Discard all modifications.
+            raise
+        root._transaction = 0
+        if root._transaction_modified:
+            if _hash(root._load_current()) != _hash(blob):
+                root._signature = root._blob_hash = None
+                root.load()
+                raise TransactionConflictError(root._filename)
+            root._save(_atomic=True)
+
     @contextmanager
     def buffered(self):
         buffered_dict = BufferedSyncedAttrDict(self, parent=self)
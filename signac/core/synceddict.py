@@ -22,6 +22,7 @@ class _SyncedDict(MutableMapping):
 
     def __init__(self, initialdata=None, parent=None):
         self._suspend_sync_ = 1
+        self._save_pending = False
         self._parent = parent
         super(_SyncedDict, self).__init__()
         if initialdata is None:
@@ -62,8 +63,42 @@ class _SyncedDict(MutableMapping):
     @contextmanager
     def _suspend_sync(self):
         self._suspend_sync_ += 1
-        yield
-        self._suspend_sync_ -= 1
+        try:
+            yield
+        finally:
+            self._suspend_sync_ -= 1
+
+    @contextmanager
+    def coalesce(self):
+        """Coalesce all modifications within this context into a single write.
+
+        The data is loaded once upon entering the context and all
+        modifications of this dict, its parents, or any nested dicts are
+        saved once when leaving the context, for example:
+
+        .. code-block:: python
+
+            with job.doc.coalesce():
+                for key, value in results.items():
+                    job.doc.results[key] = value
+
+        Modifications are saved even if an exception is raised within
+        the context. The context may be nested, in which case the data is
+        saved when leaving the outermost context.
+        """
+        root = self
+        while isinstance(root._parent, _SyncedDict):
+            root = root._parent
+        if root._suspend_sync_ <= 0:
+            root.load()
+            root._save_pending = False
+        try:
+            with root._suspend_sync():
+                yield self
+        finally:
+            if root._suspend_sync_ <= 0 and root._save_pending:
+                root._save_pending = False
+                root.save()
 
     def _load(self):
         return None
@@ -72,19 +107,23 @@ class _SyncedDict(MutableMapping):
         pass
 
     def _dfs_update(self, old, new):
-        for key in new:
+        """Update the data old of this instance in place to match new.
+
+        Nested synced dicts are updated recursively instead of being compared
+        by value, which would require to convert them to dicts first; that
+        also means that they remain valid for any external references.
+        """
+        for key, value in new.items():
             if key in old:
-                if old[key] == new[key]:
-                    continue
-                elif isinstance(new[key], Mapping) and isinstance(old[key], Mapping):
-                    self._dfs_update(old[key], new[key])
+                current = old[key]
+                if isinstance(current, _SyncedDict):
+                    if isinstance(value, Mapping):
+                        current._dfs_update(current._data, value)
+                        continue
+                elif current == value:
                     continue
-            old[key] = self._dfs_convert(new[key])
-        remove = set()
-        for key in old:
-            if key not in new:
-                remove.add(key)
-        for key in remove:
+            old[key] = self._dfs_convert(value)
+        for key in [key for key in old if key not in new]:
             del old[key]
 
     def _synced_load(self):
@@ -97,9 +136,6 @@ class _SyncedDict(MutableMapping):
                 if data is not None:
                     with self._suspend_sync():
                         self._dfs_update(self._data, data)
-                    for value in self._data:
-                        if isinstance(value, Mapping):
-                            assert type(value) == type(self)
             else:
                 self._parent.load()
 
@@ -112,6 +148,8 @@ class _SyncedDict(MutableMapping):
                 self._save()
             else:
                 self._parent.save()
+        else:
+            self._save_pending = True
 
     def __setitem__(self, key, value):
         self._synced_load()
@@ -88,6 +88,8 @@ from .common import six
 from .syncutil import dircmp
 from .syncutil import dircmp_deep
 from .syncutil import _FileModifyProxy
+from .core.codec import document_filenames
+from .core.codec import find_documents
 from .syncutil import logger
 if six.PY2:
     from collections import Mapping
@@ -221,7 +223,7 @@ def _sync_job_workspaces(src, dst, strategy, exclude, copy, copytree,
         fn_dst = os.path.join(dst.workspace(), subdir, fn)
         if os.path.isfile(fn_src):
             copy(fn_src, fn_dst)
-        elif recursive:
+        elif recursive or (not subdir and fn == src.FN_DATA):
             copytree(fn_src, fn_dst)
         else:
             logger.warning("Skip directory '{}'.".format(fn_src))
@@ -239,7 +241,7 @@ def _sync_job_workspaces(src, dst, strategy, exclude, copy, copytree,
             else:
                 logger.debug("Skip file '{}'.".format(fn))
     for _subdir in diff.subdirs:
-        if recursive:
+        if recursive or (not subdir and _subdir == src.FN_DATA):
             _sync_job_workspaces(
                 src=src, dst=dst, strategy=strategy, exclude=exclude, copy=copy, copytree=copytree,
                 recursive=recursive, deep=deep, subdir=os.path.join(subdir, _subdir))
@@ -292,10 +294,13 @@ def sync_jobs(src, dst, strategy=None, exclude=None, doc_sync=None, recursive=Fa
         :param doc_sync:
             A synchronization strategy for document keys. The default is to use a safe key-by-key
             strategy that will not overwrite any values on conflict, but instead raises a
-            :class:`~.errors.DocumentSyncConflict` exception.
+            :class:`~.errors.DocumentSyncConflict` exception. Documents are only
+            copied with :attr:`.DocSync.COPY` if they are stored in the same format,
+            otherwise a :class:`~.errors.FileSyncConflict` exception is raised.
         :param recursive:
             Recursively synchronize sub-directories encountered within
-            the job workspace directories.
+            the job workspace directories. The arrays of the job's data
+            store (:attr:`~.Job.data`) are always synchronized.
         :type recursive:
             bool
         :param follow_symlinks:
@@ -344,7 +349,13 @@ def sync_jobs(src, dst, strategy=None, exclude=None, doc_sync=None, recursive=Fa
         exclude = [exclude]
     exclude.append(src.FN_MANIFEST)
     if doc_sync != DocSync.COPY:
-        exclude.append(src.FN_DOCUMENT)
+        exclude.extend(document_filenames(src.FN_DOCUMENT))
+    else:
+        # Copying a document in another format would leave both documents in place.
+        fn_docs_src = [os.path.basename(fn) for fn in find_documents(src.fn(src.FN_DOCUMENT))]
+        fn_docs_dst = [os.path.basename(fn) for fn in find_documents(dst.fn(dst.FN_DOCUMENT))]
+        if fn_docs_src and fn_docs_dst and fn_docs_src != fn_docs_dst:
+            raise FileSyncConflict(fn_docs_src[0])
 
     if type(dry_run) == _FileModifyProxy:
         proxy = dry_run
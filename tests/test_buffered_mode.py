@@ -4,7 +4,9 @@
 import unittest
 import os
 import json
+import sys
 import logging
+import threading
 from time import sleep
 from stat import S_IREAD
 
@@ -246,6 +248,148 @@ class BufferedModeTest(BaseProjectTest):
 
             break    # only test for one job
 
+    def test_buffered_mode_threads(self):
+        jobs = [self.project.open_job(dict(a=i)) for i in range(4)]
+        for job in jobs:
+            job.init()
+            job.doc.a = 0
+        errors = []
+        barrier = threading.Event()
+
+        def work(job, buffer_size):
+            try:
+                with signac.buffered(buffer_size=buffer_size):
+                    self.assertTrue(signac.is_buffered())
+                    self.assertEqual(signac.get_buffer_size(), buffer_size)
+                    job.doc.a = 1
+                    barrier.wait()
+                with open(job.doc._filename) as file:
+                    self.assertEqual(json.load(file), {'a': 1})
+            except Exception as error:
+                errors.append(error)
+
+        threads = [threading.Thread(target=work, args=(job, 1000 + i))
+                   for i, job in enumerate(jobs)]
+        for thread in threads:
+            thread.start()
+        # Other threads in buffered mode do not affect this thread:
+        self.assertFalse(signac.is_buffered())
+        job = self.project.open_job(dict(a=-1))
+        job.doc.b = 0
+        with open(job.doc._filename) as file:
+            self.assertEqual(json.load(file), {'b': 0})
+        barrier.set()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(errors, [])
+        for job in jobs:
+            self.assertEqual(job.doc.a, 1)
+
+    def test_flush_results(self):
+        jobs = [self.project.open_job(dict(a=i)) for i in range(4)]
+        for job in jobs:
+            job.init()
+            job.doc.a = 0
+        for num_workers in (1, 4):
+            with signac.buffered(num_workers=num_workers, fsync=True):
+                for job in jobs[:3]:
+                    job.doc.a = num_workers
+                self.assertEqual(jobs[3].doc.a, 0)
+                results = signac.flush()
+                self.assertEqual(len(results), 4)
+                for job in jobs[:3]:
+                    self.assertTrue(results[job.doc._filename].written)
+                    self.assertIsNone(results[job.doc._filename].error)
+                    with open(job.doc._filename) as file:
+                        self.assertEqual(json.load(file), {'a': num_workers})
+                self.assertFalse(results[jobs[3].doc._filename].written)
+                self.assertIsNone(results[jobs[3].doc._filename].error)
+                self.assertEqual(signac.get_buffer_load(), 0)
+
+    def test_flush_results_with_file_modification(self):
+        jobs = [self.project.open_job(dict(a=i)) for i in range(2)]
+        for job in jobs:
+            job.init()
+            job.doc.a = 0
+        with signac.buffered():
+            for job in jobs:
+                job.doc.a = 1
+            sleep(1.0)
+            with open(jobs[0].doc._filename, 'wb') as file:
+                file.write(json.dumps({'a': 2}).encode())
+            results = signac.flush(raise_on_error=False)
+        self.assertFalse(results[jobs[0].doc._filename].written)
+        self.assertIsNotNone(results[jobs[0].doc._filename].error)
+        self.assertTrue(results[jobs[1].doc._filename].written)
+        self.assertEqual(jobs[0].doc.a, 2)
+        self.assertEqual(jobs[1].doc.a, 1)
+
+    def test_buffer_eviction(self):
+        jobs = [self.project.open_job(dict(a=i)) for i in range(3)]
+        for job in jobs:
+            job.init()
+            job.doc.a = 0
+
+        def on_disk(job):
+            with open(job.doc._filename) as file:
+                return json.load(file)['a']
+
+        blob_size = sys.getsizeof(json.dumps({'a': 0}).encode())
+        with signac.buffered(buffer_size=2 * blob_size):
+            jobs[0].doc.a = 1
+            self.assertEqual(jobs[1].doc.a, 0)
+            self.assertEqual(signac.get_buffer_load(), 2 * blob_size)
+            self.assertEqual(jobs[0].doc.a, 1)
+            # The least recently used unmodified document is evicted:
+            self.assertEqual(jobs[2].doc.a, 0)
+            self.assertEqual(signac.get_buffer_load(), 2 * blob_size)
+            self.assertEqual(on_disk(jobs[0]), 0)
+            jobs[2].doc.a = 1
+            # The least recently used modified document is written back:
+            self.assertEqual(jobs[1].doc.a, 0)
+            self.assertEqual(on_disk(jobs[0]), 1)
+            self.assertEqual(on_disk(jobs[2]), 0)
+            self.assertEqual(jobs[0].doc.a, 1)
+        self.assertEqual(signac.get_buffer_load(), 0)
+        for job in jobs:
+            self.assertEqual(on_disk(job), 0 if job is jobs[1] else 1)
+
+    def test_buffer_size_exceeded(self):
+        job = self.project.open_job(dict(a=0))
+        job.init()
+        with signac.buffered(buffer_size=1):
+            job.doc.a = 0
+            self.assertEqual(signac.get_buffer_load(), 0)
+            with open(job.doc._filename) as file:
+                self.assertEqual(json.load(file), {'a': 0})
+
+    def test_buffer_stats(self):
+        jobs = [self.project.open_job(dict(a=i)) for i in range(2)]
+        for job in jobs:
+            job.init()
+            job.doc.a = 0
+        signac.buffer_stats(reset=True)
+        with signac.buffered():
+            jobs[0].doc.a = 1
+            self.assertEqual(jobs[1].doc.a, 0)
+            self.assertEqual(jobs[0].doc.a, 1)
+            stats = signac.buffer_stats()
+            self.assertEqual(stats['entries'], 2)
+            self.assertEqual(stats['dirty'], 1)
+            self.assertEqual(stats['clean'], 1)
+            self.assertEqual(stats['read_misses'], 2)
+            self.assertEqual(stats['read_hits'], 1)
+            self.assertEqual(stats['writes_deferred'], 1)
+            self.assertEqual(stats['load'], signac.get_buffer_load())
+        stats = signac.buffer_stats(reset=True)
+        self.assertEqual(stats['entries'], 0)
+        self.assertEqual(stats['files_written'], 1)
+        self.assertEqual(stats['files_unchanged'], 1)
+        self.assertEqual(stats['bytes_written'], len(json.dumps({'a': 1}).encode()))
+        self.assertEqual(stats['flush_count'], 1)
+        self.assertGreaterEqual(stats['flush_time'], stats['last_flush_time'])
+        self.assertEqual(signac.buffer_stats()['files_written'], 0)
+
 
 if __name__ == '__main__':
     unittest.main()
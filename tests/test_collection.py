@@ -4,6 +4,7 @@ import warnings
 import unittest
 
 from signac import Collection
+from signac.contrib import collection
 from signac.common import six
 if six.PY2:
     from tempdir import TemporaryDirectory
@@ -140,6 +141,22 @@ class CollectionTest(unittest.TestCase):
             for _id in _ids:
                 self.assertEqual(self.c[_id]['a'], value)
 
+    def test_index_maintenance(self):
+        self.c.update([dict(_id=str(i), a=i % 3, b=dict(c=[i % 2])) for i in range(10)])
+        for key in ('a', 'b', 'b.c', 'd'):
+            self.c.index(key, build=True)
+        self.c.index_rebuild_threshold = 1.0
+        self.c['0'] = dict(a=2, d=0)
+        self.c.replace_one({'_id': '1'}, dict(a=5, b=0))
+        del self.c['2']
+        self.c.delete_many({'a': 0})
+        self.c['10'] = dict(a=0, b=dict(c=[1]))
+        expected = Collection(self.c)
+        for key in ('a', 'b', 'b.c', 'd'):
+            self.assertEqual(dict(self.c.index(key)), dict(expected.index(key, build=True)))
+        self.assertEqual(len(self.c.find({'a': {'$gt': 1}})), 4)
+        self.assertEqual(set(self.c._indexed_values), set(self.c.ids))
+
     def test_reindex(self):
         self.assertEqual(len(self.c), 0)
         docs = [dict(a=i) for i in range(10)]
@@ -329,6 +346,42 @@ class CollectionTest(unittest.TestCase):
         with self.assertRaises(ValueError):
             self.c.find({'a': {'$near': (10, 0.5, 1, 1, 5)}})
 
+    def test_find_range(self):
+        docs = [{'a': i / 4.0} for i in range(N)]
+        docs.extend([{'a': 'abc'}, {'a': 'xyz'}, {'a': None}, {'a': [1, 2]}, {'b': 0}])
+        self.c.update(docs)
+
+        def expected(cond):
+            return len([doc for doc in docs if 'a' in doc and cond(doc['a'])])
+
+        def number(x):
+            return isinstance(x, (int, float)) and not isinstance(x, bool)
+
+        for x in (-1, 0, 2.5, 10, 10.1, 30):
+            self.assertEqual(len(self.c.find({'a': {'$lt': x}})),
+                             expected(lambda v: number(v) and v < x))
+            self.assertEqual(len(self.c.find({'a': {'$gte': x}})),
+                             expected(lambda v: number(v) and v >= x))
+            self.assertEqual(len(self.c.find({'a': {'$gte': x, '$lt': x + 5}})),
+                             expected(lambda v: number(v) and x <= v < x + 5))
+            self.assertEqual(len(self.c.find({'a': {'$near': [x, 0.1, 1]}})),
+                             expected(lambda v: number(v) and
+                                      abs(v - x) <= max(0.1 * max(abs(v), abs(x)), 1)))
+        self.assertEqual(len(self.c.find({'a': {'$gt': 'b'}})), 1)
+        self.assertEqual(len(self.c.find({'a': {'$gt': 10, '$lt': 5}})), 0)
+        self.assertEqual(len(self.c.find({'a': {'$gt': 'a', '$lt': 5}})), 0)
+        self.assertEqual(len(self.c.find({'a': {'$gt': float('nan')}})), 0)
+
+        # The sorted index is maintained on modification.
+        self.c.insert_one({'_id': 'x', 'a': 5.1})
+        self.assertEqual(len(self.c.find({'a': {'$gt': 5, '$lt': 5.25}})), 1)
+        self.c.replace_one({'_id': 'x'}, {'a': 'def'})
+        self.assertEqual(len(self.c.find({'a': {'$gt': 5, '$lt': 5.25}})), 0)
+        self.assertEqual(len(self.c.find({'a': {'$gte': 'abc', '$lt': 'xyz'}})), 2)
+        self.c.delete_many({'a': {'$lt': 10}})
+        self.assertEqual(len(self.c.find({'a': {'$lt': 10}})), 0)
+        self.assertEqual(len(self.c.find({'a': {'$gte': 10}})), N - 40)
+
     def test_find_array_operators(self):
         self.assertEqual(len(self.c), 0)
         for expr, n in ARRAY_EXPRESSIONS:
@@ -338,6 +391,47 @@ class CollectionTest(unittest.TestCase):
         for expr, n in ARRAY_EXPRESSIONS:
             self.assertEqual(len(self.c.find({'a': expr})), n)
 
+    def test_find_in_lookup(self):
+        docs = [{'a': i} for i in range(10)]
+        docs.extend([{'a': [1, 2]}, {'a': [1, [2, 3]]}, {'a': 'abc'}, {'a': {'b': 0}}, {'b': 0}])
+        self.c.update(docs)
+        self.assertEqual(len(self.c.find({'a': {'$in': [0, 1.0, 'abc', 'x', None]}})), 3)
+        self.assertEqual(len(self.c.find({'a': {'$in': [[1, 2], [1, [2, 3]], [2]]}})), 2)
+        self.assertEqual(len(self.c.find({'a': {'$in': [{'b': 0}]}})), 0)
+        self.assertEqual(len(self.c.find({'a': {'$eq': [1, [2, 3]]}})), 1)
+        self.assertEqual(len(self.c.find({'a': {'$eq': 3}})), 1)
+        self.assertEqual(len(self.c.find({'a': {'$nin': [0, 1, [1, 2]]}})), len(docs) - 4)
+        self.assertEqual(len(self.c.find({'a': {'$nin': []}})), len(docs) - 1)
+        self.c.replace_one({'a': 0}, {'a': 'abc'})
+        self.assertEqual(len(self.c.find({'a': {'$in': [0, 'abc']}})), 2)
+        self.assertEqual(len(self.c.find({'a': {'$nin': [0, 'abc']}})), len(docs) - 3)
+
+    def test_explain(self):
+        self.c.update([dict(a=i, b=i % 2, c=dict(d=i % 10)) for i in range(100)])
+        self.c.index('a', build=True)
+        f = {'b': 1, 'c.d': {'$gte': 3, '$lt': 6}, 'a': {'$in': [1, 3, 5, 7]}}
+        self.assertEqual(len(self.c.find(f)), 2)
+        plan = self.c.explain(f)
+        self.assertEqual([step['key'] for step in plan], ['a', 'b', 'c.d'])
+        self.assertEqual([step['method'] for step in plan], ['index', 'check', 'check'])
+        self.assertEqual(plan[0]['estimate'], 4)
+        self.assertEqual(plan[2]['operator'], '$range')
+        self.assertEqual([step['matches'] for step in plan], [4, 4, 2])
+        self.assertEqual([step['candidates'] for step in plan], [None, 4, 4])
+        self.assertTrue(all(step['time'] >= 0 for step in plan))
+        # No index was built for the keys that were checked directly:
+        with self.assertRaises(KeyError):
+            self.c.index('b')
+        self.c.direct_check_threshold = 0
+        self.assertEqual([step['method'] for step in self.c.explain(f)], ['index'] * 3)
+        self.assertEqual(len(self.c.find(f)), 2)
+        plan = self.c.explain({'a': {'$lt': 10}, '$or': [{'b': 0}, {'c.d': 1}]})
+        self.assertEqual(plan[1]['method'], '$or')
+        self.assertEqual(len(plan[1]['steps']), 2)
+        self.assertEqual(plan[1]['matches'], 6)
+        with self.assertRaises(KeyError):
+            self.c.explain({'a': {'$foo': 0}})
+
     def test_find_regular_expression(self):
         self.assertEqual(len(self.c), 0)
         self.assertEqual(len(self.c.find({'a': {'$regex': 'foo'}})), 0)
@@ -363,6 +457,22 @@ class CollectionTest(unittest.TestCase):
         self.assertEqual(len(self.c.find({'a': {'$where': 'lambda x: x < 42'}})), 0)
         self.c.update(ARITHMETIC_DOCS)
         self.assertEqual(len(self.c.find({'a': {'$where': 'lambda x: x < 42'}})), 42)
+        self.assertEqual(len(self.c.find({'a': {'$where': lambda x: x < 42}})), 42)
+        self.assertEqual(len(self.c.find(
+            {'$or': [{'a': {'$where': lambda x: x < 2}}, {'a': {'$where': lambda x: x > 97}}]})), 4)
+        with self.assertRaises(TypeError):
+            self.c.find({'a': {'$where': object()}})
+
+    def test_predicate_cache(self):
+        self.c.update([{'a': 'hello world'}, {'a': 'foo'}, {'a': 0}])
+        for i in range(2 * collection.PREDICATE_CACHE_SIZE):
+            self.assertEqual(len(self.c.find({'a': {'$regex': 'o{}'.format(i)}})), 0)
+            self.assertEqual(len(self.c.find({'a': {'$where': 'lambda x: x == {}'.format(i)}})),
+                             int(i == 0))
+        self.assertEqual(len(collection._REGEX_CACHE._data), collection.PREDICATE_CACHE_SIZE)
+        self.assertEqual(len(collection._WHERE_CACHE._data), collection.PREDICATE_CACHE_SIZE)
+        self.assertEqual(len(self.c.find({'a': {'$regex': '^h'}})), 1)
+        self.assertIs(collection._compile_regex('^h'), collection._compile_regex('^h'))
 
     def test_find_logical_operators(self):
         self.assertEqual(len(self.c), 0)
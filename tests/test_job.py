@@ -9,6 +9,7 @@ import warnings
 import logging
 import uuid
 import copy
+import pickle
 import random
 import json
 
@@ -18,6 +19,12 @@ from signac.common import six
 from signac.errors import DestinationExistsError
 from signac.errors import JobsCorruptedError
 
+try:
+    import numpy
+    NUMPY = True
+except ImportError:
+    NUMPY = False
+
 if six.PY2:
     from tempdir import TemporaryDirectory
 else:
@@ -143,6 +150,38 @@ class JobTest(BaseJobTest):
             file.write('hello')
         self.assertTrue(job.isfile(fn))
 
+    def test_lazy_construction(self):
+        job = self.project.open_job({'a': 0, 'b': {'c': 1}})
+        self.assertIsNone(job._sp)
+        self.assertIsNone(job._workspace)
+        self.assertFalse(hasattr(job, '__dict__'))
+        self.assertEqual(job.sp.b.c, 1)
+        self.assertIsNotNone(job._sp)
+        self.assertEqual(job.workspace(), os.path.join(self.project.workspace(), job.get_id()))
+        self.assertEqual(job.fn('x'), os.path.join(job.workspace(), 'x'))
+
+    def test_pickle(self):
+        job = self.project.open_job({'a': 0})
+        job.init()
+        job.doc.b = 1
+        job2 = pickle.loads(pickle.dumps(job))
+        self.assertEqual(job2, job)
+        self.assertEqual(job2.statepoint(), {'a': 0})
+        self.assertEqual(job2.doc.b, 1)
+        self.assertEqual(job2._project, self.project)
+
+    def test_pickle_subclass(self):
+        job = _JobWithAttributes(self.project, {'a': 0})
+        job.label = 'x'
+        job2 = pickle.loads(pickle.dumps(job))
+        self.assertEqual(job2, job)
+        self.assertEqual(job2.label, 'x')
+        self.assertEqual(job2.statepoint(), {'a': 0})
+
+
+class _JobWithAttributes(signac.contrib.job.Job):
+    pass
+
 
 class JobSPInterfaceTest(BaseJobTest):
 
@@ -771,6 +810,24 @@ class JobDocumentTest(BaseJobTest):
         setattr(job.doc, key, d4)
         check_content(key, d4)
 
+    def test_doc_transaction(self):
+        job = self.open_job(test_token)
+        with job.doc.transaction():
+            for i in range(10):
+                job.doc['a{}'.format(i)] = i
+            self.assertFalse(job.isfile(job.FN_DOCUMENT))
+        self.assertEqual(len(job.doc), 10)
+        self.assertEqual(self.project.open_job(id=job.get_id()).doc.a9, 9)
+        with self.assertRaises(KeyError):
+            with job.document.transaction():
+                job.doc.a0 = -1
+                job.doc['x']
+        self.assertEqual(job.doc.a0, 0)
+        with self.project.document.transaction():
+            self.project.doc.a = 0
+            self.project.doc.b = 1
+        self.assertEqual(self.project.doc(), {'a': 0, 'b': 1})
+
     def test_sp_formatting(self):
         job = self.open_job({'a': 0})
         self.assertEqual('{job.statepoint.a}'.format(job=job), str(job.sp.a))
@@ -872,5 +929,83 @@ class JobDocumentTest(BaseJobTest):
         self.assertEqual(len(dst2_job.document), 1)
 
 
+@unittest.skipIf(not NUMPY, 'test requires the numpy package')
+class JobDataTest(BaseJobTest):
+
+    def test_set_get_del(self):
+        job = self.open_job(test_token)
+        self.assertEqual(len(job.data), 0)
+        self.assertNotIn('a', job.data)
+        with self.assertRaises(KeyError):
+            job.data['a']
+        job.data['a'] = numpy.arange(10)
+        job.data['b'] = [[1.0, 2.0], [3.0, 4.0]]
+        job.data['c'] = numpy.zeros(0)
+        self.assertEqual(set(job.data), {'a', 'b', 'c'})
+        self.assertIn('a', job.data)
+        self.assertTrue(job.isfile(os.path.join(job.FN_DATA, 'a.npy')))
+        a = job.data['a']
+        self.assertIsInstance(a, numpy.memmap)
+        self.assertEqual(a[2:5].tolist(), [2, 3, 4])
+        with self.assertRaises(ValueError):
+            a[0] = 1    # read-only
+        self.assertEqual(job.data['b'][:, 1].tolist(), [2.0, 4.0])
+        self.assertEqual(job.data['c'].size, 0)
+        job.data['a'] = numpy.ones(3)
+        self.assertEqual(job.data['a'].tolist(), [1.0, 1.0, 1.0])
+        del job.data['a']
+        self.assertNotIn('a', job.data)
+        with self.assertRaises(KeyError):
+            del job.data['a']
+        with self.assertRaises(KeyError):
+            job.data['../a'] = 0
+        with self.assertRaises(ValueError):
+            job.data['d'] = numpy.array([{}], dtype=object)
+        self.assertEqual(set(job.data), {'b', 'c'})
+
+    def test_write(self):
+        job = self.open_job(test_token)
+        job.data['a'] = numpy.zeros((4, 2))
+        job.data.write('a', (slice(1, 3), 0), 1.0)
+        self.assertEqual(job.data['a'][:, 0].tolist(), [0.0, 1.0, 1.0, 0.0])
+        array = job.data.open('a')
+        array[3] = 2.0
+        array.flush()
+        del array
+        self.assertEqual(job.data['a'][3].tolist(), [2.0, 2.0])
+        with self.assertRaises(KeyError):
+            job.data.write('b', 0, 0)
+
+    def test_init(self):
+        job = self.open_job(test_token)
+        self.assertNotIn(job, self.project)
+        job.data['a'] = numpy.zeros(3)
+        self.assertIn(job, self.project)
+        self.assertTrue(job.isfile(job.FN_MANIFEST))
+        self.project.check()
+        project = signac.get_project(root=self.project.root_directory())
+        project._sp_cache.clear()
+        self.assertEqual([job_.get_id() for job_ in project.find_jobs()], [job.get_id()])
+
+    def test_sync_clear_move(self):
+        job = self.open_job(test_token)
+        job.data['a'] = numpy.arange(3)
+        root = os.path.join(self._tmp_dir.name, 'other')
+        os.mkdir(root)
+        other = self.project_class.init_project(name='other', root=root)
+        dst = other.open_job(test_token)
+        dst.sync(job)
+        self.assertEqual(dst.data['a'].tolist(), [0, 1, 2])
+        job.data['a'] = numpy.arange(4)
+        dst.sync(job, strategy=signac.sync.FileSync.always)
+        self.assertEqual(dst.data['a'].tolist(), [0, 1, 2, 3])
+        dst.clear()
+        self.assertEqual(len(dst.data), 0)
+        dst.remove()
+        job.move(other)
+        self.assertEqual(job.data['a'].tolist(), [0, 1, 2, 3])
+        self.assertTrue(job.data._root.startswith(other.workspace()))
+
+
 if __name__ == '__main__':
     unittest.main()
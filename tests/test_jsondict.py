@@ -2,10 +2,16 @@
 # All rights reserved.
 # This software is licensed under the BSD 3-Clause License.
 import os
+import json
+import time
 import unittest
 import uuid
 
 from signac.core.jsondict import JSONDict
+from signac.core.jsondict import set_strict_mode, in_strict_mode
+from signac.core.jsondict import buffer_reads_writes
+from signac.core.codec import get_codec, decode
+from signac.errors import TransactionConflictError
 from signac.common import six
 
 if six.PY2:
@@ -15,6 +21,18 @@ else:
 
 FN_DICT = 'jsondict.json'
 
+try:
+    import msgpack  # noqa
+    MSGPACK = True
+except ImportError:
+    MSGPACK = False
+
+try:
+    import cbor2  # noqa
+    CBOR2 = True
+except ImportError:
+    CBOR2 = False
+
 
 def testdata():
     return str(uuid.uuid4())
@@ -218,6 +236,158 @@ class JSONDictTest(BaseJSONDictTest):
             self.assertNotIn(key, b)
         self.assertNotIn(key, jsd)
 
+    def test_read_cache(self):
+        jsd = self.get_json_dict()
+        key = 'read_cache'
+        d = self.get_testdata()
+        d2 = self.get_testdata()
+        jsd[key] = d
+        mtime = time.time() - 10
+
+        def modify(data):
+            with open(self._fn_dict, 'w') as file:
+                file.write(json.dumps(data))
+            os.utime(self._fn_dict, (mtime, mtime))
+
+        os.utime(self._fn_dict, (mtime, mtime))
+        self.assertEqual(jsd[key], d)
+        # A modification that does not change the file signature is not detected...
+        modify({key: d2})
+        self.assertEqual(jsd[key], d)
+        self.assertFalse(in_strict_mode())
+        # ...unless in strict mode.
+        set_strict_mode(True)
+        try:
+            self.assertTrue(in_strict_mode())
+            self.assertEqual(jsd[key], d2)
+        finally:
+            set_strict_mode(False)
+        modify({key: d, 'other': 0})
+        self.assertEqual(jsd[key], d)
+        self.assertEqual(len(jsd), 2)
+        os.remove(self._fn_dict)
+        self.assertEqual(len(jsd), 0)
+
+    def test_unsaved_in_place_modification(self):
+        jsd = self.get_json_dict()
+        jsd['a'] = [0]
+        mtime = time.time() - 10
+        os.utime(self._fn_dict, (mtime, mtime))
+        # In-place modifications of mutable values are not saved, but kept...
+        jsd['a'].append(1)
+        self.assertEqual(jsd['a'], [0, 1])
+        with open(self._fn_dict) as file:
+            self.assertEqual(json.load(file), {'a': [0]})
+        # ...and written with the next save.
+        jsd['b'] = 0
+        with open(self._fn_dict) as file:
+            self.assertEqual(json.load(file), {'a': [0, 1], 'b': 0})
+        os.utime(self._fn_dict, (mtime, mtime))
+        # In strict mode, they are discarded on the next access.
+        set_strict_mode(True)
+        try:
+            jsd['a'].append(2)
+            self.assertEqual(jsd['a'], [0, 1])
+        finally:
+            set_strict_mode(False)
+
+    def test_reload_unchanged_content(self):
+        jsd = self.get_json_dict()
+        jsd['a'] = {'b': {'c': 0}, 'd': 1}
+        # The content is not parsed again, if it did not change.
+        jsd._signature = None
+        self.assertIsNone(jsd._load())
+        with buffer_reads_writes():
+            self.assertEqual(jsd['a']['d'], 1)
+            self.assertIsNone(jsd._load())
+        # In strict mode, the content is always parsed again.
+        set_strict_mode(True)
+        try:
+            self.assertEqual(jsd._load(), {'a': {'b': {'c': 0}, 'd': 1}})
+            with buffer_reads_writes():
+                self.assertEqual(jsd['a']['d'], 1)
+                self.assertEqual(jsd._load(), {'a': {'b': {'c': 0}, 'd': 1}})
+        finally:
+            set_strict_mode(False)
+
+    def test_coalesce(self):
+        jsd = self.get_json_dict()
+        jsd['a'] = {'b': {}}
+        with jsd.coalesce():
+            for i in range(3):
+                jsd['a']['b'][str(i)] = i
+            with open(self._fn_dict) as file:
+                self.assertEqual(json.load(file), {'a': {'b': {}}})
+        with open(self._fn_dict) as file:
+            self.assertEqual(json.load(file), {'a': {'b': {'0': 0, '1': 1, '2': 2}}})
+
+    def test_reload_nested(self):
+        jsd = self.get_json_dict()
+        jsd['a'] = {'b': {'c': 0}, 'd': 1}
+        child = jsd['a']['b']
+        with open(self._fn_dict, 'w') as file:
+            file.write(json.dumps({'a': {'b': {'c': 1, 'x': 0}}, 'e': 2}))
+        self.assertEqual(child['c'], 1)
+        self.assertEqual(jsd(), {'a': {'b': {'c': 1, 'x': 0}}, 'e': 2})
+        # Nested dicts are updated in place:
+        self.assertIs(jsd['a']['b'], child)
+        child['c'] = 2
+        with open(self._fn_dict) as file:
+            self.assertEqual(json.load(file), {'a': {'b': {'c': 2, 'x': 0}}, 'e': 2})
+
+    def test_transaction(self):
+        jsd = self.get_json_dict()
+        jsd2 = self.get_json_dict()
+        key = 'transaction'
+        d = self.get_testdata()
+        d2 = self.get_testdata()
+        jsd[key] = d
+        with jsd.transaction():
+            jsd[key] = d2
+            jsd['nested'] = {'a': 0}
+            jsd.nested.a = 1
+            with jsd.nested.transaction():
+                jsd.nested.b = 2
+            self.assertEqual(jsd[key], d2)
+            self.assertEqual(jsd2[key], d)
+            self.assertNotIn('nested', jsd2)
+        self.assertEqual(jsd2(), {key: d2, 'nested': {'a': 1, 'b': 2}})
+
+        # Modifications are discarded on error.
+        with self.assertRaises(RuntimeError):
+            with jsd.transaction():
+                jsd[key] = d
+                del jsd['nested']
+                raise RuntimeError()
+        self.assertEqual(jsd(), {key: d2, 'nested': {'a': 1, 'b': 2}})
+
+        # External modifications are detected.
+        with self.assertRaises(TransactionConflictError):
+            with jsd.transaction():
+                jsd[key] = d
+                jsd2['other'] = 0
+        self.assertEqual(jsd(), {key: d2, 'nested': {'a': 1, 'b': 2}, 'other': 0})
+
+    def test_buffered_transaction(self):
+        jsd = self.get_json_dict()
+        key = 'buffered_transaction'
+        d = self.get_testdata()
+        with buffer_reads_writes():
+            with jsd.transaction():
+                jsd[key] = d
+            self.assertEqual(jsd[key], d)
+        self.assertEqual(self.get_json_dict()[key], d)
+
+    def test_transaction_buffered_dict(self):
+        jsd = self.get_json_dict()
+        jsd['a'] = 0
+        with jsd.transaction():
+            with jsd.buffered() as b:
+                b['q'] = 1
+            self.assertEqual(jsd['q'], 1)
+            jsd['r'] = 2
+        self.assertEqual(self.get_json_dict()(), {'a': 0, 'q': 1, 'r': 2})
+
 
 class JSONDictWriteConcernTest(JSONDictTest):
 
@@ -236,5 +406,46 @@ class JSONDictNestedDataWriteConcernTest(JSONDictNestedDataTest, JSONDictWriteCo
     pass
 
 
+class JSONDictCodecTest(BaseJSONDictTest):
+
+    def test_get_codec(self):
+        self.assertEqual(get_codec().name, 'json')
+        self.assertEqual(get_codec('json').name, 'json')
+        with self.assertRaises(ValueError):
+            get_codec('invalid')
+
+    def _test_codec(self, name):
+        codec = get_codec(name)
+        data = {'a': 0, 'b': [1.5, 2, None], 'c': {'d': 'text', 'e': True}}
+        self.assertEqual(decode(codec.encode(data)), data)
+        jsd = JSONDict(filename=self._fn_dict, codec=codec)
+        jsd.update(data)
+        with open(self._fn_dict, 'rb') as file:
+            self.assertEqual(file.read(), codec.encode(data))
+        # Documents are read regardless of the codec:
+        jsd2 = JSONDict(filename=self._fn_dict)
+        self.assertEqual(jsd2(), data)
+        jsd2['f'] = 0
+        with open(self._fn_dict, 'rb') as file:
+            self.assertEqual(json.loads(file.read().decode()), jsd2())
+        self.assertEqual(jsd(), jsd2())
+
+    def test_json_codec(self):
+        self._test_codec('json')
+
+    @unittest.skipIf(not MSGPACK, 'test requires the msgpack package')
+    def test_msgpack_codec(self):
+        self._test_codec('msgpack')
+
+    @unittest.skipIf(not CBOR2, 'test requires the cbor2 package')
+    def test_cbor_codec(self):
+        self._test_codec('cbor')
+
+    @unittest.skipIf(MSGPACK, 'test requires that msgpack is not installed')
+    def test_missing_codec(self):
+        with self.assertRaises(ImportError):
+            get_codec('msgpack')
+
+
 if __name__ == '__main__':
     unittest.main()
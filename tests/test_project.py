@@ -3,19 +3,27 @@
 # This software is licensed under the BSD 3-Clause License.
 import unittest
 import os
+import gc
+import gzip
+import json
+import sqlite3
+import time
 import uuid
+import shutil
 import warnings
 import logging
 
 import signac
 from signac.common import six
 from signac.errors import DestinationExistsError
-from signac.contrib.project import _find_all_links
+from signac.errors import FileSyncConflict
+from signac.contrib.project import _find_all_links, JOB_ID_REGEX
 from signac.contrib.schema import ProjectSchema
 from signac.contrib.errors import JobsCorruptedError
 from signac.contrib.errors import WorkspaceError
 
 from test_job import BaseJobTest
+from test_jsondict import MSGPACK
 
 if six.PY2:
     logging.basicConfig(level=logging.WARNING)
@@ -290,6 +298,145 @@ class ProjectTest(BaseProjectTest):
         self.assertEqual(len(statepoints), len(self.project))
         self.assertEqual(len(statepoints), len(self.project.find_jobs()))
 
+    def test_contains(self):
+        jobs = [self.project.open_job({'a': i}) for i in range(5)]
+        for job in jobs[:3]:
+            job.init()
+        self.assertEqual([job in self.project for job in jobs], [True] * 3 + [False] * 2)
+        self.assertEqual(self.project.contains_many(jobs), [True] * 3 + [False] * 2)
+        self.assertEqual(
+            self.project.contains_many([job.get_id() for job in reversed(jobs)]),
+            [False] * 2 + [True] * 3)
+        self.assertEqual(self.project.contains_many([]), [])
+        jobs[0].remove()
+        self.assertNotIn(jobs[0], self.project)
+        self.assertEqual(self.project.contains_many(jobs[:1]), [False])
+
+    def test_init_jobs(self):
+        statepoints = [{'a': i, 'b': {'c': i % 3}} for i in range(20)]
+        jobs = self.project.init_jobs(statepoints + statepoints[:2])
+        self.assertEqual(len(jobs), len(statepoints) + 2)
+        self.assertEqual(len(self.project), len(statepoints))
+        self.assertIs(jobs[-1], jobs[1])
+        for sp, job in zip(statepoints, jobs):
+            self.assertIs(job, self.project.open_job(sp))
+            self.assertEqual(job.statepoint(), sp)
+            self.assertIn(job, self.project)
+            self.assertIn(job.get_id(), self.project._sp_cache)
+        for workers in (1, 4):
+            jobs_ = self.project.init_jobs(statepoints, workers=workers)
+            self.assertEqual(len(self.project), len(statepoints))
+            self.assertTrue(all(a is b for a, b in zip(jobs, jobs_)))
+        self.assertEqual(self.project.init_jobs([]), [])
+        with self.assertRaises(TypeError):
+            self.project.init_jobs([{'a': object()}])
+
+    def test_remove_jobs(self):
+        jobs = self.project.init_jobs([{'a': i, 'b': i % 2} for i in range(10)])
+        for job in jobs:
+            job.doc.a = job.sp.a
+            with open(job.fn('data.txt'), 'w') as file:
+                file.write('x' * 100)
+            os.mkdir(job.fn('sub'))
+            with open(job.fn('sub/data.txt'), 'w') as file:
+                file.write('x' * 100)
+        self.assertEqual(len(self.project.find_jobs(doc_filter={'a': 0})), 1)
+        freed = self.project.remove_jobs(filter={'b': 0}, workers=4)
+        self.assertGreaterEqual(freed, 5 * 200)
+        self.assertEqual(len(self.project), 5)
+        self.assertEqual(len(self.project.find_jobs({'b': 0})), 0)
+        self.assertEqual(len(self.project.find_jobs(doc_filter={'a': 0})), 0)
+        for job in jobs:
+            self.assertEqual(job in self.project, job.sp.b == 1)
+        self.assertEqual(self.project.remove_jobs(jobs[:2], workers=1), freed // 5)
+        self.assertEqual(len(self.project), 4)
+        self.assertEqual(self.project.remove_jobs([job.get_id() for job in jobs[:2]]), 0)
+        with self.assertRaises(ValueError):
+            self.project.remove_jobs(jobs, filter={'b': 1})
+        self.project.remove_jobs()
+        self.assertEqual(len(self.project), 0)
+        # Instances of removed jobs initialize the job again on document access.
+        jobs[0].doc.y = 2
+        self.assertIn(jobs[0], self.project)
+        self.assertEqual(jobs[0].doc(), {'y': 2})
+
+    def test_clear_jobs(self):
+        jobs = self.project.init_jobs([{'a': i} for i in range(4)])
+        for job in jobs:
+            job.doc.a = job.sp.a
+            with open(job.fn('data.txt'), 'w') as file:
+                file.write('x' * 100)
+        freed = self.project.clear_jobs(jobs[:3], workers=2)
+        self.assertEqual(freed, 300)
+        self.assertEqual(len(self.project), 4)
+        for job in jobs[:3]:
+            self.assertIn(job, self.project)
+            self.assertEqual(len(job.doc), 0)
+            self.assertFalse(job.isfile('data.txt'))
+        self.assertEqual(jobs[3].doc.a, 3)
+        self.assertTrue(jobs[3].isfile('data.txt'))
+        self.assertEqual(len(self.project.find_jobs(doc_filter={'a': {'$exists': True}})), 1)
+        self.assertEqual(self.project.clear_jobs([self.project.open_job({'a': 4})]), 0)
+        self.assertNotIn(self.project.open_job({'a': 4}), self.project)
+
+    @unittest.skipIf(not MSGPACK, 'test requires the msgpack package')
+    def test_document_codec(self):
+        job_json = self.project.open_job({'a': -1})
+        job_json.doc.b = -1
+        self.project.config['document_codec'] = 'msgpack'
+        jobs = [self.project.open_job({'a': i}) for i in range(3)]
+        for job in jobs:
+            job.doc.b = job.sp.a
+            self.assertFalse(job.isfile(job.FN_DOCUMENT))
+            with open(job.fn('signac_job_document.msgpack'), 'rb') as file:
+                self.assertNotEqual(file.read(1), b'{')
+        # Existing documents keep their format:
+        job_json.doc.b = -2
+        self.assertEqual(job_json.doc.b, -2)
+        self.assertFalse(job_json.isfile('signac_job_document.msgpack'))
+        self.project.doc.c = 0
+        jobs[0].document = {'b': 10}
+        self.assertEqual(jobs[0].doc(), {'b': 10})
+        self.assertEqual(self.project.doc(), {'c': 0})
+        self.assertEqual(len(self.project.find_jobs(doc_filter={'b': {'$gt': 1}})), 2)
+        index = {doc['_id']: doc['b'] for doc in self.project.index(include_job_document=True)}
+        self.assertEqual(index, {job.get_id(): job.doc.b for job in jobs + [job_json]})
+        crawler = signac.contrib.SignacProjectCrawler(self.project.root_directory())
+        self.assertEqual({doc['_id']: doc['b'] for doc in crawler.crawl()}, index)
+        self.project.clear_jobs([jobs[1]])
+        self.assertEqual(jobs[1].doc(), {})
+        # Documents in different formats are not copied on top of each other:
+        with TemporaryDirectory(prefix='signac_') as tmp_dir:
+            other = self.project_class.init_project(name='other', root=tmp_dir)
+            other.open_job({'a': 0}).doc.b = 0
+            with self.assertRaises(FileSyncConflict):
+                other.open_job({'a': 0}).sync(jobs[0], doc_sync=signac.sync.DocSync.COPY)
+            self.assertEqual(
+                [fn for fn in os.listdir(other.open_job({'a': 0}).workspace())
+                 if fn.startswith('signac_job_document')], ['signac_job_document.json'])
+        # Documents that exist in more than one format are refused:
+        with open(jobs[0].fn('signac_job_document.msgpack'), 'rb') as file:
+            with open(job_json.fn('signac_job_document.msgpack'), 'wb') as file_other:
+                file_other.write(file.read())
+        project = self.project_class.get_project(root=self.project.root_directory())
+        with self.assertRaises(RuntimeError):
+            project.open_job({'a': -1}).doc()
+        with self.assertRaises(RuntimeError):
+            project.find_jobs(doc_filter={'b': 10})
+        os.remove(job_json.fn('signac_job_document.msgpack'))
+        # All files with a .json suffix are JSON files:
+        for dirpath, dirnames, filenames in os.walk(self.project.root_directory()):
+            for fn in filenames:
+                if fn.endswith('.json'):
+                    with open(os.path.join(dirpath, fn), 'rb') as file:
+                        json.loads(file.read().decode())
+
+        # Documents are read regardless of the configured codec:
+        del self.project.config['document_codec']
+        project = self.project_class.get_project(root=self.project.root_directory())
+        self.assertEqual(project.open_job({'a': 2}).doc.b, 2)
+        self.assertEqual(project.doc.c, 0)
+
     def test_len_find_jobs(self):
         statepoints = [{'a': i, 'b': i < 3} for i in range(5)]
         for sp in statepoints:
@@ -305,6 +452,41 @@ class ProjectTest(BaseProjectTest):
             pass
         self.assertEqual(i, len(self.project) - 1)
 
+    def test_open_job_cache(self):
+        job = self.project.open_job({'a': 0})
+        job.init()
+        self.assertIs(self.project.open_job({'a': 0}), job)
+        self.assertIs(self.project.open_job(id=job.get_id()), job)
+        self.assertIs(self.project.open_job(id=job.get_id()[:6]), job)
+        self.assertIs(next(iter(self.project)), job)
+        self.assertIsNot(self.project.open_job({'a': 1}), job)
+        job_id = job.get_id()
+        del job
+        gc.collect()
+        self.assertNotIn(job_id, self.project._job_cache)
+        job = self.project.open_job(id=job_id)
+        self.assertEqual(job.get_id(), job_id)
+        self.assertIs(self.project.open_job({'a': 0}), job)
+        # Reset jobs are not returned for their previous id.
+        job.reset_statepoint({'a': 2})
+        self.assertIsNone(self.project._get_cached_job(job_id))
+        self.assertIsNot(self.project.open_job({'a': 0}), job)
+
+    def test_open_job_cache_removed(self):
+        job = self.project.open_job({'a': 0})
+        job.doc.x = 1
+        self.project.remove_jobs([job])
+        self.assertIs(self.project.open_job({'a': 0}), job)
+        job.doc.y = 2
+        self.assertIn(job, self.project)
+        self.assertEqual(job.doc(), {'y': 2})
+        # The workspace is removed externally:
+        shutil.rmtree(job.workspace())
+        job = self.project.open_job({'a': 0})
+        job.doc.z = 3
+        self.assertIn(job, self.project)
+        self.assertEqual(job.doc(), {'z': 3})
+
     def test_open_job_by_id(self):
         statepoints = [{'a': i} for i in range(5)]
         jobs = [self.project.open_job(sp) for sp in statepoints]
@@ -340,6 +522,215 @@ class ProjectTest(BaseProjectTest):
         with self.assertRaises(KeyError):
             self.project.open_job(id='abc')
 
+    def test_persistent_cache(self):
+        statepoints = [{'a': i} for i in range(5)]
+        for sp in statepoints:
+            self.project.open_job(sp).init()
+        mtime = time.time() - 10
+        os.utime(self.project.workspace(), (mtime, mtime))
+        with warnings.catch_warnings():
+            warnings.filterwarnings('ignore', category=FutureWarning, module='signac')
+            self.project.update_cache()
+            self.assertIsNone(self.project.update_cache())
+        self.assertTrue(self.project.isfile(self.project.FN_CACHE))
+        job = self.project.open_job(statepoints[0])
+        os.remove(job.fn(job.FN_MANIFEST))
+        project = self.project_class.get_project(root=self.project.root_directory())
+        self.assertEqual(project.get_statepoint(job.get_id()), statepoints[0])
+        self.assertEqual(project.open_job(id=job.get_id()[:16]), job)
+        self.assertEqual(len(project._sp_cache), 1)
+        self.assertEqual(
+            set(project._find_job_ids_by_prefix('')), set(project.find_job_ids()))
+        with warnings.catch_warnings():
+            warnings.filterwarnings('ignore', category=FutureWarning, module='signac')
+            job.remove()
+            self.assertEqual(project.update_cache(), len(statepoints) - 1)
+        self.assertEqual(len(project._get_persistent_cache()), len(statepoints) - 1)
+
+    def test_read_job_documents(self):
+        jobs = [self.project.open_job({'a': i}) for i in range(10)]
+        for job in jobs:
+            job.init()
+            if job.sp.a % 2:
+                job.doc.b = job.sp.a
+        job_ids = [job.get_id() for job in jobs]
+        for num_workers in (1, 4):
+            docs = self.project._read_job_documents(
+                job_ids, num_workers=num_workers, max_in_flight=2)
+            self.assertEqual(list(docs), [job.doc() for job in jobs])
+        self.project.config['document_index_num_workers'] = '3'
+        self.assertEqual(len(self.project.find_jobs(doc_filter={'b': {'$exists': True}})), 5)
+
+    def test_document_cache(self):
+        if self.project.Job is not signac.contrib.job.Job:
+            self.skipTest("The document cache is only used for the default job class.")
+        jobs = [self.project.open_job({'a': i}) for i in range(5)]
+        mtime = time.time() - 10
+        for job in jobs:
+            job.doc.status = 'running'
+            os.utime(job.fn(job.FN_DOCUMENT), (mtime, mtime))
+        with warnings.catch_warnings():
+            warnings.filterwarnings('ignore', category=FutureWarning, module='signac')
+            self.project.update_cache()
+        self.assertEqual(len(self.project.find_job_ids(doc_filter={'status': 'running'})), 5)
+        self.assertEqual(len(self.project._doc_cache), 5)
+
+        # Unchanged documents are neither copied nor parsed again.
+        def _decode(blob):
+            raise AssertionError("The document should be served from the cache.")
+
+        decode = signac.contrib.project.decode
+        signac.contrib.project.decode = _decode
+        try:
+            self.assertEqual(len(self.project.find_job_ids(doc_filter={'status': 'running'})), 5)
+            docs = list(self.project._read_job_documents([jobs[0].get_id()]))
+            self.assertIs(docs[0], self.project._doc_cache[jobs[0].get_id()][1])
+        finally:
+            signac.contrib.project.decode = decode
+
+        # Unchanged documents are served from the cache.
+        signature, _ = self.project._doc_cache[jobs[0].get_id()]
+        self.project._doc_cache[jobs[0].get_id()] = signature, {'status': 'cached'}
+        self.assertEqual(len(self.project.find_job_ids(doc_filter={'status': 'cached'})), 1)
+
+        # Modified documents are read again.
+        jobs[0].doc.status = 'done'
+        jobs[1].doc.status = 'done'
+        self.assertEqual(len(self.project.find_job_ids(doc_filter={'status': 'running'})), 3)
+        self.assertEqual(len(self.project.find_job_ids(doc_filter={'status': 'cached'})), 0)
+
+        # The document cache is persistent.
+        project = self.project_class.get_project(root=self.project.root_directory())
+        self.assertEqual(len(project._get_persistent_cache().get_documents(
+            [job.get_id() for job in jobs])), 5)
+        self.assertEqual(len(project.find_job_ids(doc_filter={'status': 'done'})), 2)
+
+        # Modifying an indexed document does not modify the cached document.
+        jobs[2].doc.res = {'e': 1}
+        os.utime(jobs[2].fn(jobs[2].FN_DOCUMENT), (mtime, mtime))
+        self.assertEqual(len(self.project.find_job_ids(doc_filter={'res.e': 1})), 1)
+        for doc in self.project.index(include_job_document=True):
+            if doc['_id'] == jobs[2].get_id():
+                doc['res']['e'] = 2
+        self.assertEqual(len(self.project.find_job_ids(doc_filter={'res.e': 1})), 1)
+
+        # Failing to access the persistent cache does not fail the query.
+        def _locked(*args, **kwargs):
+            raise sqlite3.OperationalError("database is locked")
+
+        cache = self.project._get_persistent_cache()
+        cache.get_documents = cache.update_documents = _locked
+        self.project._doc_cache.clear()
+        self.assertEqual(len(self.project.find_job_ids(doc_filter={'status': 'done'})), 2)
+
+    def test_workspace_snapshot(self):
+        statepoints = [{'a': i} for i in range(5)]
+        for sp in statepoints:
+            self.project.open_job(sp).init()
+        mtime = time.time() - 10
+        os.utime(self.project.workspace(), (mtime, mtime))
+        job_ids = set(self.project.find_job_ids())
+        self.assertEqual(len(job_ids), len(statepoints))
+
+        def _job_dirs():
+            raise AssertionError("The workspace should not be listed.")
+
+        _job_dirs_orig = self.project._job_dirs
+        self.project._job_dirs = _job_dirs
+        try:
+            self.assertEqual(set(self.project.find_job_ids()), job_ids)
+            self.assertEqual(len(self.project.find_jobs({'a': 0})), 1)
+            self.assertEqual(len(self.project), len(statepoints))
+        finally:
+            self.project._job_dirs = _job_dirs_orig
+        self.project.open_job({'a': len(statepoints)}).init()
+        self.assertEqual(len(self.project), len(statepoints) + 1)
+        self.assertEqual(len(self.project.find_jobs({'a': len(statepoints)})), 1)
+
+    def test_persistent_cache_legacy_format(self):
+        job = self.project.open_job({'a': 0})
+        job.init()
+        with gzip.open(self.project.fn(self.project.FN_CACHE_LEGACY), 'wb') as cachefile:
+            cachefile.write(json.dumps({job.get_id(): {'a': 0}}).encode())
+        project = self.project_class.get_project(root=self.project.root_directory())
+        self.assertEqual(len(project._get_persistent_cache()), 1)
+        self.assertFalse(project.isfile(project.FN_CACHE_LEGACY))
+        self.assertTrue(project.isfile(project.FN_CACHE))
+
+    def test_workspace_sharding(self):
+        statepoints = [{'a': i} for i in range(10)]
+        for sp in statepoints:
+            self.project.open_job(sp).document['test'] = True
+        job_ids = set(self.project.find_job_ids())
+        index = {doc['_id']: doc for doc in self.project.index()}
+        self.assertEqual(self.project.shard_workspace(2), len(statepoints))
+        for job in self.project:
+            _id = job.get_id()
+            self.assertEqual(
+                job.workspace(), os.path.join(self.project.workspace(), _id[:2], _id[2:4], _id))
+            self.assertTrue(os.path.isdir(job.workspace()))
+        self.assertFalse(any(JOB_ID_REGEX.match(d) for d in os.listdir(self.project.workspace())))
+        self.assertEqual(set(self.project.find_job_ids()), job_ids)
+        self.assertEqual(len(self.project.find_jobs({'a': 0})), 1)
+        for _id in job_ids:
+            self.assertEqual(self.project.open_job(id=_id[:6]).get_id(), _id)
+            self.assertEqual(self.project.open_job(id=_id[:3]).get_id(), _id)
+        self.assertEqual({doc['_id']: doc for doc in self.project.index()}, index)
+        crawler = signac.contrib.SignacProjectCrawler(self.project.root_directory())
+        self.assertEqual({doc['_id']: doc for doc in crawler.crawl()}, index)
+        # Files within shard directories are not associated with any job.
+        job = self.project.open_job(statepoints[0])
+        for dirpath in (job.workspace(), os.path.dirname(job.workspace())):
+            with open(os.path.join(dirpath, 'test.txt'), 'w') as file:
+                file.write('test\n')
+        docs = [doc for doc in self.project.index({r'.*/test\.txt': 'TextFile'})
+                if doc.get('format') == 'TextFile']
+        self.assertEqual(len(docs), 2)
+        self.assertEqual(
+            sorted(doc.get('signac_id', '') for doc in docs), ['', job.get_id()])
+        os.remove(os.path.join(os.path.dirname(job.workspace()), 'test.txt'))
+
+        # The sharding is stored in the project configuration.
+        project = self.project_class.get_project(root=self.project.root_directory())
+        self.assertEqual(project._sharding, 2)
+        self.assertEqual(set(project.find_job_ids()), job_ids)
+        job = project.open_job({'a': len(statepoints)})
+        job.init()
+        self.assertIn(job, project)
+        self.assertTrue(os.path.isdir(
+            os.path.join(project.workspace(), job.get_id()[:2], job.get_id()[2:4])))
+
+        view_prefix = os.path.join(self._tmp_pr, 'view')
+        project.create_linked_view(prefix=view_prefix)
+        links = list(_find_all_links(view_prefix))
+        self.assertEqual(
+            {os.path.realpath(os.path.join(view_prefix, link, 'job')) for link in links},
+            {os.path.realpath(job.workspace()) for job in project})
+
+        # Synchronize with a project using the flat layout.
+        with TemporaryDirectory(prefix='signac_') as tmp_dir:
+            other = self.project_class.init_project(name='other', root=tmp_dir)
+            other.sync(project)
+            self.assertEqual(len(other), len(project))
+            for job in other:
+                self.assertTrue(os.path.isdir(os.path.join(other.workspace(), job.get_id())))
+
+        self.assertEqual(project.shard_workspace(0), len(project))
+        self.assertEqual(set(os.listdir(project.workspace())), set(project.find_job_ids()))
+        self.assertEqual(len(project.find_jobs({'a': 0})), 1)
+        with self.assertRaises(ValueError):
+            project.shard_workspace(5)
+
+    def test_workspace_sharding_unnormalized_path(self):
+        with TemporaryDirectory(prefix='signac_') as tmp_dir:
+            project = self.project_class.init_project(
+                name='sharded', root=tmp_dir, workspace='workspace' + os.sep)
+            for i in range(3):
+                project.open_job({'a': i}).init()
+            self.assertEqual(project.shard_workspace(2), 3)
+            self.assertEqual(project.shard_workspace(0), 3)
+            self.assertEqual(set(os.listdir(project.workspace())), set(project.find_job_ids()))
+
     def test_create_linked_view(self):
 
         def clean(filter=None):
@@ -196,6 +196,32 @@ class BasicShellTest(unittest.TestCase):
         self.assertEqual(len(job_to_remove.doc), 0)
         self.call('python -m signac rm {}'.format(job_to_remove.get_id()).split())
         self.assertNotIn(job_to_remove, project)
+        # Without --parallel, each job is removed right after its confirmation:
+        job_ids = sorted(project.find_job_ids())
+        out = self.call('python -m signac rm -i -v {}'.format(' '.join(job_ids)).split(),
+                        input='y\nn\n')
+        first, second = out.split('Are you sure')[1:]
+        self.assertEqual(first.count(job_ids[0]), 2)    # prompt and verbose output
+        self.assertEqual(second.count(job_ids[1]), 1)   # prompt only
+        self.assertNotIn(job_ids[0], project.find_job_ids())
+        self.assertIn(job_ids[1], project.find_job_ids())
+        for sp in sps:
+            project.open_job(sp).init()
+        self.call('python -m signac rm --parallel 2 {}'.format(
+            ' '.join(project.find_job_ids())).split())
+        self.assertEqual(len(project), 0)
+
+    def test_shard(self):
+        self.call('python -m signac init my_project'.split())
+        project = signac.Project()
+        for i in range(3):
+            project.open_job({'a': i}).init()
+        job_ids = set(project.find_job_ids())
+        self.call('python -m signac shard 1 --yes'.split())
+        project = signac.get_project()
+        self.assertEqual(project._sharding, 1)
+        self.assertEqual(set(os.listdir(project.workspace())), {_id[:2] for _id in job_ids})
+        self.assertEqual(set(project.find_job_ids()), job_ids)
 
     def test_shell(self):
         self.call('python -m signac init my_project'.split())
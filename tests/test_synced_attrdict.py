@@ -460,6 +460,38 @@ class SyncedAttrDictTest(unittest.TestCase):
         self.assertEqual(len(sad), 1)
         self.assert_only_read()
 
+    def test_coalesce(self):
+        sad = self.get_sad({'a': {'b': {}}})
+        self.sync_point.reset()
+        with sad.a.coalesce():
+            for i in range(10):
+                sad.a.b[str(i)] = i
+            sad.a.update({'c': 0, 'd': {'e': 0}})
+            sad.a.d.e = 1
+            self.assertEqual(len(sad.a.b), 10)
+        self.assert_read_write(2, 1)    # includes the access of sad.a
+        self.assertEqual(sad.a.d.e, 1)
+        self.sync_point.reset()
+        with sad.coalesce():
+            with sad.a.coalesce():
+                sad.x = 0
+            self.assert_read_write(1, 0)
+        self.assert_only_write()
+        # Nothing is saved without any modification:
+        with sad.coalesce():
+            self.assertEqual(sad.x, 0)
+        self.assert_only_read()
+        # Modifications are saved on error:
+        with self.assertRaises(KeyError):
+            with sad.coalesce():
+                sad.y = 0
+                sad['z']
+        self.assert_read_write(1, 1)
+        self.assertEqual(sad.y, 0)
+        self.assert_only_read()
+        sad.y = 1
+        self.assert_read_write(1, 1)
+
 
 if __name__ == '__main__':
     unittest.main()